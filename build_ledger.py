@@ -0,0 +1,109 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+
+from io_utils import write_json_atomic
+
+LEDGER_NAME = "_build_ledger.json"
+
+
+def load_ledger(output_dir):
+    """
+    Loads the {game_id: input fingerprint} ledger from the output directory,
+    or an empty one if no build has recorded it yet.
+    """
+    ledger_path = os.path.join(output_dir, LEDGER_NAME)
+    if not os.path.exists(ledger_path):
+        return {}
+    try:
+        with open(ledger_path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read build ledger ({e}). All games will be checked as new.")
+        return {}
+
+
+def save_ledger(output_dir, ledger):
+    """
+    Writes the ledger atomically next to the generated game files.
+    """
+    write_json_atomic(os.path.join(output_dir, LEDGER_NAME), ledger, separators=(",", ":"), sort_keys=True)
+
+
+def scan_files(directory, suffix):
+    """
+    Lists a directory once and returns {file stem: (mtime_ns, size)} for files ending
+    in `suffix`, replacing one exists/stat call per game with a single scan.
+    """
+    found = {}
+    if not os.path.isdir(directory):
+        return found
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(suffix) and entry.is_file():
+                stat = entry.stat()
+                found[entry.name[:-len(suffix)]] = (stat.st_mtime_ns, stat.st_size)
+    return found
+
+
+def game_content_hashes(indexed_df, offsets):
+    """
+    Hashes every row of a table indexed by build_game_index in one vectorized pass
+    and folds the row hashes into one value per game: {game_id: hex digest}.
+    """
+    if not offsets:
+        return {}
+    row_hashes = pd.util.hash_pandas_object(indexed_df, index=False).to_numpy()
+    game_ids = sorted(offsets, key=lambda g: offsets[g][0])
+    starts = np.array([offsets[g][0] for g in game_ids], dtype=np.int64)
+    lengths = np.diff(np.append(starts, len(row_hashes)))
+    # Mix in each row's position within its game so reordered rows change the hash.
+    positions = (np.arange(len(row_hashes)) - np.repeat(starts, lengths)).astype(np.uint64)
+    mixed = row_hashes ^ (positions * np.uint64(0x9E3779B97F4A7C15))
+    sums = np.add.reduceat(mixed, starts)
+    return {game_id: f"{int(total):016x}" for game_id, total in zip(game_ids, sums)}
+
+
+def compute_input_fingerprints(game_ids, rotation_index, rotation_offsets, dates_index, dates_offsets, pbp_dir):
+    """
+    Returns {str(game_id): fingerprint} covering the game's rotation rows, its date
+    rows and the (mtime, size) of its PBP file. The PBP directory is listed once.
+    """
+    rotation_hashes = game_content_hashes(rotation_index, rotation_offsets)
+    dates_hashes = game_content_hashes(dates_index, dates_offsets)
+    pbp_files = scan_files(pbp_dir, ".csv")
+
+    fingerprints = {}
+    for game_id in game_ids:
+        try:
+            key = int(game_id)
+        except (TypeError, ValueError):
+            key = None
+        pbp_stat = pbp_files.get(str(game_id))
+        pbp_part = f"{pbp_stat[0]}:{pbp_stat[1]}" if pbp_stat else "none"
+        fingerprints[str(game_id)] = f"{rotation_hashes.get(key, '0')}-{dates_hashes.get(key, '0')}-{pbp_part}"
+    return fingerprints
+
+
+def plan_build(fingerprints, ledger, existing_outputs, force=False):
+    """
+    Splits games into (to_build, up_to_date) lists of str game IDs.
+
+    A game is up to date when its output exists and the ledger holds the same
+    fingerprint. Outputs from before the ledger existed (no entry at all) are
+    adopted as up to date, matching the old "skip if the file exists" behaviour,
+    and their fingerprint is recorded so later input changes are detected.
+    """
+    to_build, up_to_date = [], []
+    for game_id, fingerprint in fingerprints.items():
+        if force or game_id not in existing_outputs:
+            to_build.append(game_id)
+        elif game_id not in ledger:
+            ledger[game_id] = fingerprint
+            up_to_date.append(game_id)
+        elif ledger[game_id] == fingerprint:
+            up_to_date.append(game_id)
+        else:
+            to_build.append(game_id)
+    return to_build, up_to_date
@@ -0,0 +1,55 @@
+import os
+import re
+
+# Season directories are named "{year}" for the regular season and "{year}ps" for the playoffs.
+SEASON_DIR_PATTERN = re.compile(r"^(\d{4})(ps)?$")
+SEASON_TYPES = ["", "ps"]  # "" for regular season, "ps" for postseason
+
+
+def discover_season_dirs(root, start_year=None, end_year=None):
+    """
+    Lists `root` once and returns [(year, season_suffix, year_str, path)] for every
+    season directory present, ordered by year with the regular season first.
+    Years outside [start_year, end_year] are skipped; either bound may be None.
+    """
+    seasons = []
+    if not os.path.isdir(root):
+        return seasons
+    with os.scandir(root) as entries:
+        for entry in entries:
+            match = SEASON_DIR_PATTERN.match(entry.name)
+            if not match or not entry.is_dir():
+                continue
+            year, season_suffix = int(match.group(1)), match.group(2) or ""
+            if start_year is not None and year < start_year:
+                continue
+            if end_year is not None and year > end_year:
+                continue
+            seasons.append((year, season_suffix, entry.name, entry.path))
+    seasons.sort(key=lambda season: (season[0], SEASON_TYPES.index(season[1])))
+    return seasons
+
+
+def discover_team_files(root, start_year=None, end_year=None, team_ids=None):
+    """
+    Finds every {root}/{year}{ps}/{team_id}.csv with one directory scan per season
+    instead of probing each (year, season type, team) path.
+    Returns [(file_path, year_str, team_id)] ordered by season, then team ID.
+    If team_ids is given, files for other IDs are ignored.
+    """
+    wanted = set(team_ids) if team_ids is not None else None
+    found = []
+    for _, _, year_str, season_path in discover_season_dirs(root, start_year, end_year):
+        season_files = []
+        with os.scandir(season_path) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                if ext != ".csv" or not stem.isdigit() or not entry.is_file():
+                    continue
+                team_id = int(stem)
+                if wanted is not None and team_id not in wanted:
+                    continue
+                season_files.append((entry.path, year_str, team_id))
+        season_files.sort(key=lambda task: task[2])
+        found.extend(season_files)
+    return found
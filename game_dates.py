@@ -0,0 +1,153 @@
+import pandas as pd
+import os
+import io
+import json
+import time
+import urllib.request
+import urllib.error
+
+from io_utils import apply_dtypes, atomic_path, write_json_atomic
+
+# Parquet is optional; without it the cached copy is kept as CSV.
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+DATES_CSV_URL = "https://raw.githubusercontent.com/gabriel1200/shot_data/refs/heads/master/game_dates.csv"
+DATES_CACHE_NAME = "game_dates.parquet" if PYARROW_AVAILABLE else "game_dates.csv"
+DATES_META_NAME = "game_dates_meta.json"
+
+# Compact schema for the dates table. The team abbreviation columns share one category
+# set so they can still be compared with each other (e.g. team == HTM).
+DATES_DTYPES = {"GAME_ID": "int32", "TEAM_ID": "int32", "date": "int32", "season": "category"}
+TEAM_ABBREVIATION_COLUMNS = ["HTM", "VTM", "team", "opp_team"]
+
+
+def compact_dates(df):
+    """
+    Casts a dates DataFrame to DATES_DTYPES in place (see apply_dtypes) and returns it,
+    giving the team abbreviation columns one shared category set. Non-numeric IDs or
+    dates are treated as missing (with a warning) rather than failing the whole table.
+    """
+    apply_dtypes(df, DATES_DTYPES, coerce=True)
+    team_columns = [column for column in TEAM_ABBREVIATION_COLUMNS if column in df.columns]
+    if team_columns:
+        abbreviations = pd.unique(pd.concat([df[column].dropna().astype(str) for column in team_columns]))
+        for column in team_columns:
+            df[column] = pd.Categorical(df[column], categories=sorted(abbreviations))
+    return df
+
+
+def read_dates_file(path):
+    """
+    Reads a dates file (Parquet or CSV, by extension) with the compact schema applied.
+    """
+    if path.endswith(".parquet"):
+        return compact_dates(pd.read_parquet(path))
+    return compact_dates(pd.read_csv(path))
+
+
+def _read_meta(cache_dir):
+    meta_path = os.path.join(cache_dir, DATES_META_NAME)
+    if not os.path.exists(meta_path):
+        return {}
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read game dates cache metadata ({e}). Refreshing the cache.")
+        return {}
+
+
+def _write_meta(cache_dir, meta):
+    write_json_atomic(os.path.join(cache_dir, DATES_META_NAME), meta, indent=1, sort_keys=True)
+
+
+def _write_cache(cache_path, dates):
+    with atomic_path(cache_path) as tmp_path:
+        if cache_path.endswith(".parquet"):
+            dates.to_parquet(tmp_path, index=False)
+        else:
+            dates.to_csv(tmp_path, index=False)
+
+
+def fetch_if_changed(url, etag=None, last_modified=None, timeout=10):
+    """
+    Conditional GET: returns (body, etag, last_modified), with body None when the
+    server answers 304 Not Modified.
+    """
+    request = urllib.request.Request(url)
+    if etag:
+        request.add_header("If-None-Match", etag)
+    if last_modified:
+        request.add_header("If-Modified-Since", last_modified)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read(), response.headers.get("ETag"), response.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag, last_modified
+        raise
+
+
+def sync_dates_cache(cache_dir, url=DATES_CSV_URL, offline=False, refresh_interval=3600, timeout=10):
+    """
+    Returns the cached dates table, refreshing it from `url` first when needed.
+
+    The remote file is re-downloaded only when its ETag/Last-Modified changed, and it is
+    checked at most once per refresh_interval seconds. With offline=True, or when the
+    network is unavailable, the cached copy is used as-is. Returns None if there is
+    nothing cached and it cannot be fetched.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, DATES_CACHE_NAME)
+    meta = _read_meta(cache_dir)
+    have_cache = os.path.exists(cache_path) and meta.get("url") == url
+
+    if offline or (have_cache and time.time() - meta.get("checked_at", 0) < refresh_interval):
+        if have_cache:
+            return read_dates_file(cache_path)
+        print(f"Warning: Offline mode, but no cached game dates in {cache_dir}.")
+        return None
+
+    try:
+        body, etag, last_modified = fetch_if_changed(
+            url, meta.get("etag") if have_cache else None, meta.get("last_modified") if have_cache else None, timeout)
+    except (urllib.error.URLError, OSError) as e:
+        if not have_cache:
+            print(f"Warning: Could not download game dates from {url} ({e}) and nothing is cached.")
+            return None
+        print(f"Warning: Could not refresh game dates from {url} ({e}). Using the cached copy.")
+        return read_dates_file(cache_path)
+
+    if body is None:
+        meta["checked_at"] = time.time()
+        _write_meta(cache_dir, meta)
+        return read_dates_file(cache_path)
+
+    dates = compact_dates(pd.read_csv(io.BytesIO(body)))
+    _write_cache(cache_path, dates)
+    _write_meta(cache_dir, {"url": url, "etag": etag, "last_modified": last_modified,
+                            "checked_at": time.time(), "rows": len(dates)})
+    print(f"Downloaded {len(dates)} game date rows into {cache_path}")
+    return dates
+
+
+def load_game_dates(cache_dir, url=DATES_CSV_URL, local_path=None, offline=False, min_season=None,
+                    refresh_interval=3600):
+    """
+    Loads the game dates table from local_path if given (fully offline), otherwise
+    from the local cache of `url` (see sync_dates_cache). Seasons before min_season
+    (e.g. '2013-14') are dropped. Returns an empty DataFrame if nothing could be loaded.
+    """
+    if local_path:
+        dates = read_dates_file(local_path)
+    else:
+        dates = sync_dates_cache(cache_dir, url, offline=offline, refresh_interval=refresh_interval)
+    if dates is None:
+        return pd.DataFrame()
+    if min_season is not None:
+        dates = dates[(dates["season"].astype(str) >= min_season).to_numpy()].reset_index(drop=True)
+    return dates
@@ -0,0 +1,101 @@
+import os
+import json
+
+from io_utils import atomic_path, write_json_atomic
+
+# orjson is optional; it is only used to speed up compact output.
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+OUTPUT_MODES = ("pretty", "compact")
+BUNDLE_NAME = "_games_index.jsonl"
+BUNDLE_OFFSETS_NAME = "_games_index_offsets.json"
+
+
+def serialize_game(game_output, output_mode="pretty"):
+    """
+    Serializes one game's output to bytes. "pretty" is the original indent=4 layout;
+    "compact" is minified JSON, written with orjson when it is installed.
+    """
+    if output_mode == "pretty":
+        return json.dumps(game_output, indent=4).encode("utf-8")
+    if output_mode == "compact":
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(game_output, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(game_output, separators=(",", ":")).encode("utf-8")
+    raise ValueError(f"Unknown output mode '{output_mode}'. Expected one of: {', '.join(OUTPUT_MODES)}")
+
+
+def write_game_json(output_file_path, game_output, output_mode="pretty"):
+    """
+    Writes one game's JSON file in the requested output mode.
+    """
+    with open(output_file_path, "wb") as f:
+        f.write(serialize_game(game_output, output_mode))
+
+
+def load_bundle_offsets(output_dir):
+    """
+    Loads the offsets table of an existing bundle, or an empty one if there is none.
+    """
+    offsets_path = os.path.join(output_dir, BUNDLE_OFFSETS_NAME)
+    if not os.path.exists(offsets_path) or not os.path.exists(os.path.join(output_dir, BUNDLE_NAME)):
+        return {}
+    try:
+        with open(offsets_path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read bundle offsets ({e}). Rebuilding the bundle from the game files.")
+        return {}
+
+
+def write_games_bundle(output_dir, game_ids, rebuilt=None):
+    """
+    Packs the per-game files for `game_ids` into one JSON Lines file, one minified game
+    per line, plus an offsets table {game_id: [byte offset, byte length]} so a client
+    can fetch a single game with an HTTP range request. Games without a file are left out.
+
+    With `rebuilt` (the str game IDs whose files were just written), the other games'
+    lines are copied from the existing bundle instead of re-parsing their files, and
+    the bundle is left as it is when nothing was rebuilt and it already holds exactly
+    `game_ids`. Returns the number of games bundled.
+    """
+    bundle_path = os.path.join(output_dir, BUNDLE_NAME)
+    offsets_path = os.path.join(output_dir, BUNDLE_OFFSETS_NAME)
+    old_offsets = load_bundle_offsets(output_dir) if rebuilt is not None else {}
+    if old_offsets and not rebuilt and list(old_offsets) == [str(game_id) for game_id in game_ids]:
+        return len(old_offsets)
+
+    offsets = {}
+    position = 0
+    old_bundle = open(bundle_path, "rb") if old_offsets else None
+    try:
+        with atomic_path(bundle_path) as tmp_path, open(tmp_path, "wb") as bundle:
+            for game_id in game_ids:
+                game_file_path = os.path.join(output_dir, f"{game_id}.json")
+                line = None
+                entry = old_offsets.get(str(game_id))
+                if entry is not None and str(game_id) not in rebuilt and os.path.exists(game_file_path):
+                    old_bundle.seek(entry[0])
+                    line = old_bundle.read(entry[1] + 1)
+                    if len(line) != entry[1] + 1 or not line.endswith(b"\n"):
+                        line = None  # Bundle changed under us; fall back to the game file
+                if line is None:
+                    try:
+                        with open(game_file_path, "rb") as f:
+                            game_output = json.loads(f.read())
+                    except (OSError, ValueError):
+                        continue
+                    line = serialize_game(game_output, "compact") + b"\n"
+                bundle.write(line)
+                offsets[str(game_id)] = [position, len(line) - 1]
+                position += len(line)
+    finally:
+        if old_bundle is not None:
+            old_bundle.close()
+
+    write_json_atomic(offsets_path, offsets, separators=(",", ":"))
+    return len(offsets)
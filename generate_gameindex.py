@@ -1,203 +1,487 @@
 import pandas as pd
+import numpy as np
 import os
-import json
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-# Attempt to import the nba_api library for fetching team data
-try:
-    from nba_api.stats.static import teams
-    NBA_API_AVAILABLE = True
-except ImportError:
-    NBA_API_AVAILABLE = False
-    print("WARNING: 'nba_api' library not found. Team IDs will need to be provided manually if not cached.")
+from rotation_loader import load_rotation_files, concat_rotation_frames
+from rotation_store import load_rotation_store
+from pbp_reader import read_pbp_facts
+from build_ledger import load_ledger, save_ledger, scan_files, compute_input_fingerprints, plan_build
+from game_output import write_game_json, write_games_bundle, BUNDLE_NAME
+from team_registry import get_team_ids
+from data_discovery import discover_team_files
+from lineups import lineup_timeline, lineups_by_game
+from game_dates import DATES_CSV_URL, load_game_dates
+from home_away import resolve_home_away
+from stint_stats import compute_stint_stats, load_stint_stats, stint_stats_by_game
 
 # --- Part 1: Rotation Data Loading ---
 
-def fetch_rotation_data(base_path, start_year=2014, end_year=2025):
+def fetch_rotation_data(base_path, start_year=2014, end_year=None, workers=1, executor="thread", store_dir=None):
     """
     Loads rotation data for all NBA teams for specified years from a local directory structure.
+    Season directories are discovered by scanning, so end_year=None picks up every season on disk.
+    Set workers > 1 to read the files concurrently with a "thread" or "process" pool.
+    If store_dir is given, the CSVs are mirrored into a columnar store there and only
+    files that changed since the last run are re-parsed.
     """
     rotations_path = os.path.join(base_path, "rotations")
-    years = range(start_year, end_year + 1)
-    season_types = ["", "ps"]  # "" for regular season, "ps" for postseason
 
-    team_ids = []
-    if NBA_API_AVAILABLE:
-        print("Fetching team list from nba_api...")
-        try:
-            nba_teams = teams.get_teams()
-            team_ids = [team['id'] for team in nba_teams]
-            print(f"Successfully fetched {len(team_ids)} team IDs.")
-        except Exception as e:
-            print(f"ERROR: Unable to fetch team IDs from API: {e}")
-    else:
-        print("WARNING: nba_api not available. Manual team list would be needed if not for local files.")
+    team_ids = get_team_ids()
 
     if not team_ids:
         print("\n--- Halting execution: No team IDs were loaded. ---")
         return pd.DataFrame()
 
-    all_dfs = []
+    tasks = discover_team_files(rotations_path, start_year, end_year, team_ids=team_ids)
+    print(f"Discovered {len(tasks)} rotation files under {rotations_path}.")
+
+    if store_dir:
+        print(f"\n--- Loading Rotation Data from Columnar Store ({store_dir}) ---")
+        stored_df = load_rotation_store(tasks, store_dir, workers=workers, executor=executor)
+        if stored_df is not None:
+            print("\n--- Rotation Data Load Complete ---")
+            return stored_df
+
     print("\n--- Starting Rotation Data Load from Local Files---")
-    for year in years:
-        for season_suffix in season_types:
-            year_str = f"{year}{season_suffix}"
-            for team_id in team_ids:
-                file_path = os.path.join(rotations_path, year_str, f"{team_id}.csv")
-                if os.path.exists(file_path):
-                    try:
-                        df = pd.read_csv(file_path)
-                        df["season"] = year_str
-                        df["team_id"] = team_id
-                        all_dfs.append(df)
-                    except Exception as e:
-                        print(f"Could not process file {file_path}: {e}")
+    if workers > 1:
+        print(f"Reading {len(tasks)} files with a {executor} pool of {workers} workers...")
+    all_dfs, errors = load_rotation_files(tasks, workers=workers, executor=executor)
+    for file_path, error in errors:
+        print(f"Could not process file {file_path}: {error}")
 
     print("\n--- Rotation Data Load Complete ---")
     if all_dfs:
-        return pd.concat(all_dfs, ignore_index=True)
+        return concat_rotation_frames(all_dfs)
     else:
         print("Warning: No rotation data was loaded.")
         return pd.DataFrame()
 
 
-# --- Part 2: Game Index Generation ---
+# --- Part 2: Per-Game Row Index ---
+
+def build_game_index(df, column="GAME_ID"):
+    """
+    Sorts a DataFrame by its GAME_ID normalized to an integer and builds an offset
+    table {game_id: (start, stop)}, so each game's rows are a positional slice
+    instead of a full-table scan. Rows whose GAME_ID is not numeric are dropped.
+    """
+    if df.empty or column not in df.columns:
+        return df.iloc[0:0], {}
+
+    keys = pd.to_numeric(df[column], errors="coerce")
+    valid = keys.notna().to_numpy()
+    keys = keys[valid].astype("int64").to_numpy()
+
+    order = np.argsort(keys, kind="stable")
+    indexed_df = df[valid].iloc[order].reset_index(drop=True)
+    sorted_keys = keys[order]
+
+    unique_keys, starts = np.unique(sorted_keys, return_index=True)
+    stops = np.append(starts[1:], len(sorted_keys))
+    offsets = dict(zip(unique_keys.tolist(), zip(starts.tolist(), stops.tolist())))
+    return indexed_df, offsets
+
+
+def get_game_rows(indexed_df, offsets, game_id):
+    """
+    Returns the rows for one game from an index built by build_game_index.
+    Accepts GAME_IDs as ints or zero-padded strings; unknown games give an empty frame.
+    """
+    try:
+        bounds = offsets.get(int(game_id))
+    except (TypeError, ValueError):
+        bounds = None
+    if bounds is None:
+        return indexed_df.iloc[0:0]
+    return indexed_df.iloc[bounds[0]:bounds[1]]
+
+
+def build_player_lookups(indexed_df, offsets):
+    """
+    Derives every game's player names and starters in one vectorized pass over a
+    rotation table indexed by build_game_index.
+    Returns ({game_id: {person_id: "First Last"}}, {game_id: [starter person_ids]}).
+    """
+    if not offsets:
+        return {}, {}
+
+    game_ids = sorted(offsets, key=lambda g: offsets[g][0])
+    lengths = [offsets[g][1] - offsets[g][0] for g in game_ids]
+    # Missing names render as "nan", as they would through an f-string.
+    players = pd.DataFrame({
+        "game": np.repeat(np.array(game_ids, dtype=np.int64), lengths),
+        "person_id": indexed_df["PERSON_ID"].astype(str).to_numpy(),
+        "name": (indexed_df["PLAYER_FIRST"].astype(str).fillna("nan") + " "
+                 + indexed_df["PLAYER_LAST"].astype(str).fillna("nan")).to_numpy(),
+        # IN_TIME_REAL may be nullable Int32; a missing time is not a starter.
+        "starter": indexed_df["IN_TIME_REAL"].eq(0).to_numpy(dtype=bool, na_value=False),
+    })
+
+    names = players.drop_duplicates(["game", "person_id", "name"])
+    name_games, name_starts = np.unique(names["game"].to_numpy(), return_index=True)
+    name_stops = np.append(name_starts[1:], len(names))
+    name_ids, name_values = names["person_id"].tolist(), names["name"].tolist()
+    name_dicts = {
+        game_id: dict(zip(name_ids[start:stop], name_values[start:stop]))
+        for game_id, start, stop in zip(name_games.tolist(), name_starts, name_stops)
+    }
+
+    starters = players[players["starter"]]
+    starter_games, starter_starts = np.unique(starters["game"].to_numpy(), return_index=True)
+    starter_stops = np.append(starter_starts[1:], len(starters))
+    starter_ids = starters["person_id"].tolist()
+    starter_lists = {
+        game_id: starter_ids[start:stop]
+        for game_id, start, stop in zip(starter_games.tolist(), starter_starts, starter_stops)
+    }
+    return name_dicts, starter_lists
+
+
+def build_game_date_lookup(dates_df):
+    """
+    Parses the dates table once into {game_id: (ISO date, home team ID, away team ID, playoffs)}.
+    Dates are converted in one vectorized call, and each game's two team rows are pivoted
+    into home/away columns in a single step (home is the row whose team matches HTM).
+    A side without a matching row is None, which sends the game to the PBP fallback;
+    an unparseable date is None as well.
+    """
+    if dates_df.empty or "GAME_ID" not in dates_df.columns:
+        return {}
+
+    dates = dates_df.assign(_game=pd.to_numeric(dates_df["GAME_ID"], errors="coerce")).dropna(subset=["_game"])
+    dates["_game"] = dates["_game"].astype("int64")
+    # The date and playoff flag come from each game's first row.
+    first = dates.drop_duplicates("_game")
+    iso_dates = pd.to_datetime(pd.to_numeric(first["date"], errors="coerce").astype("Int64").astype(str),
+                               format="%Y%m%d", errors="coerce").dt.strftime("%Y-%m-%d")
+    playoffs = first["playoffs"] if "playoffs" in first.columns else pd.Series(None, index=first.index)
+
+    if {"team", "HTM", "TEAM_ID"}.issubset(dates.columns):
+        dates["_side"] = np.where(dates["team"] == dates["HTM"], "home", "away")
+        teams = dates.pivot_table(index="_game", columns="_side", values="TEAM_ID", aggfunc="first")
+    else:
+        teams = pd.DataFrame()
+    teams = teams.reindex(index=first["_game"].to_numpy(), columns=["home", "away"])
+
+    rows = zip(first["_game"].tolist(), iso_dates.tolist(), teams["home"].tolist(),
+               teams["away"].tolist(), playoffs.tolist())
+    return {
+        game_id: (iso_date if isinstance(iso_date, str) else None,
+                  None if pd.isna(home) else int(home),
+                  None if pd.isna(away) else int(away),
+                  None if pd.isna(playoff) else bool(playoff))
+        for game_id, iso_date, home, away, playoff in rows
+    }
+
+
+# --- Part 3: Game Index Generation ---
+
+def build_game_file(game_id, game_rotations, date_info, pbp_dir, output_file_path, name_dict, starter_ids,
+                    pbp_tail_scan=True, output_mode="pretty", extras=None, final_score=None, log=print):
+    """
+    Builds and writes the JSON file for one game from its own rotation rows, its entry
+    in the date lookup (see build_game_date_lookup, None if the game is missing) with
+    home/away already resolved by resolve_home_away, plus its precomputed player names
+    and starters (see build_player_lookups).
+    `extras` holds optional precomputed fields (e.g. lineups) added to the output as-is.
+    `final_score` is a (home, away) pair already read from the PBP file (e.g. by the
+    home/away fallback); the file is only read here when it is None.
+    Returns True if the file was written. Progress and warnings go through `log`,
+    so worker processes can collect them for the parent instead of printing.
+    """
+    if game_rotations.empty:
+        log(f"Warning: Skipping game {game_id} due to missing rotation data.")
+        return False
+
+    # Date info is needed regardless of the team ID method.
+    if date_info is None:
+        # This case should be rare since we are iterating on game_ids from dates_df, but it's a good safeguard.
+        log(f"Warning: Could not find date info for game {game_id}. Skipping.")
+        return False
+
+    game_date, home_team_id, away_team_id, _ = date_info
+    if game_date is None:
+        log(f"Warning: Could not parse the date for game {game_id}. Skipping.")
+        return False
+
+    pbp_file_path = os.path.join(pbp_dir, f"{game_id}.csv")
 
-def generate_game_files(rotation_df, dates_df, pbp_dir, output_dir="game_info"):
+    if not home_team_id or not away_team_id:
+        log(f"Warning: Failed to identify teams for game {game_id}. Skipping.")
+        return False
+
+    try:
+        team_ids = game_rotations["TEAM_ID"]
+        home_team_details = game_rotations[team_ids.eq(home_team_id).to_numpy(dtype=bool, na_value=False)].iloc[0]
+        away_team_details = game_rotations[team_ids.eq(away_team_id).to_numpy(dtype=bool, na_value=False)].iloc[0]
+    except IndexError:
+        log(f"Warning: Could not find team details in rotation data for game {game_id}. Skipping.")
+        return False
+
+    home_score, away_score = None, None
+    pbp_facts = None
+    if final_score is not None:
+        home_score, away_score = final_score
+    elif os.path.exists(pbp_file_path):
+        try:
+            pbp_facts = read_pbp_facts(pbp_file_path, need_home_team=False, tail_scan=pbp_tail_scan)
+        except Exception as e:
+            log(f"Error processing PBP file for game {game_id}: {e}")
+    if pbp_facts is not None:
+        home_score, away_score = pbp_facts["home_score"], pbp_facts["away_score"]
+
+    starter_on = ','.join(starter_ids)
+
+    game_output = {
+        "homeTeam": {"name": home_team_details["TEAM_NAME"], "score": home_score, "logo": f"https://cdn.nba.com/logos/nba/{home_team_id}/primary/L/logo.svg"},
+        "awayTeam": {"name": away_team_details["TEAM_NAME"], "score": away_score, "logo": f"https://cdn.nba.com/logos/nba/{away_team_id}/primary/L/logo.svg"},
+        "game_id": str(game_id),
+        "date": game_date,
+        "status": "Final",
+        "players": name_dict,
+        "starter_on": starter_on
+    }
+    if extras:
+        game_output.update(extras)
+
+    write_game_json(output_file_path, game_output, output_mode)
+    return True
+
+
+def _shard_rows(indexed_df, offsets, game_ids):
+    """
+    Gathers the rows of several games from an index built by build_game_index.
+    """
+    ranges = []
+    for game_id in game_ids:
+        bounds = offsets.get(int(game_id))
+        if bounds is not None:
+            ranges.append(np.arange(bounds[0], bounds[1]))
+    if not ranges:
+        return indexed_df.iloc[0:0]
+    return indexed_df.iloc[np.concatenate(ranges)]
+
+
+def _generate_shard(shard):
+    """
+    Worker entry point: builds every game in one shard from the shard's own rows.
+    Returns (generated game IDs, log messages) for the parent to collect.
+    """
+    (game_ids, rotation_rows, date_lookup, name_dicts, starter_lists, game_extras, pbp_scores,
+     pbp_dir, output_dir, pbp_tail_scan, output_mode) = shard
+    rotation_index, rotation_offsets = build_game_index(rotation_rows)
+
+    generated, messages = [], []
+    for game_id in game_ids:
+        try:
+            if build_game_file(
+                game_id,
+                get_game_rows(rotation_index, rotation_offsets, game_id),
+                date_lookup.get(int(game_id)),
+                pbp_dir,
+                os.path.join(output_dir, f"{game_id}.json"),
+                name_dicts.get(int(game_id), {}),
+                starter_lists.get(int(game_id), []),
+                pbp_tail_scan=pbp_tail_scan,
+                output_mode=output_mode,
+                extras=game_extras.get(int(game_id)),
+                final_score=pbp_scores.get(int(game_id)),
+                log=messages.append
+            ):
+                generated.append(game_id)
+        except Exception as e:
+            messages.append(f"Error: Failed to generate game {game_id}: {e}")
+    return generated, messages
+
+
+def generate_game_files(rotation_df, dates_df, pbp_dir, output_dir="game_info", pbp_tail_scan=True, force=False,
+                        workers=1, shards_per_worker=4, output_mode="pretty", bundle=False, include_lineups=False,
+                        include_stint_stats=False, stint_stats=None):
     """
-    Processes data to generate JSON files for each game, skipping existing files
-    and using PBP data as a fallback for team identification.
+    Processes data to generate JSON files for each game, skipping games whose inputs
+    are unchanged since the last build and using PBP data as a fallback for team
+    identification (resolved for all games up front and cached, see resolve_home_away).
+    Input fingerprints are kept in a build ledger in output_dir; force=True rebuilds
+    every game. With pbp_tail_scan=True the final score is found by scanning backwards
+    from the end of each PBP file.
+    With workers > 1 the games are split into shards and built by a process pool.
+    output_mode="compact" writes minified files (via orjson when installed), and
+    bundle=True also packs every game into one JSON Lines file with a byte-offset table.
+    include_lineups=True adds each team's on-court lineup intervals under "lineups", and
+    include_stint_stats=True adds per-player minutes and stint statistics under "stint_stats"
+    (from `stint_stats`, e.g. the cached table from load_stint_stats, or computed here).
+    Returns (generated count, skipped count, error messages).
     """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
         print(f"Created output directory: {output_dir}")
 
-    game_ids = dates_df["GAME_ID"].unique()
+    # GAME_ID may be nullable Int32; rows without one cannot be built.
+    game_ids = dates_df["GAME_ID"].dropna().unique()
     print(f"Found {len(game_ids)} unique games to process.")
-    
+
+    # Index both tables once so each game's rows are an O(1) slice lookup.
+    rotation_index, rotation_offsets = build_game_index(rotation_df)
+    dates_index, dates_offsets = build_game_index(dates_df)
+    name_dicts, starter_lists = build_player_lookups(rotation_index, rotation_offsets)
+    date_lookup = build_game_date_lookup(dates_df)
+
+    # Optional fields computed for all games at once and merged into each game's JSON.
+    game_extras = {}
+    if include_lineups:
+        for game_id, team_lineups in lineups_by_game(lineup_timeline(rotation_index)).items():
+            game_extras.setdefault(game_id, {})["lineups"] = {
+                str(team_id): intervals for team_id, intervals in team_lineups.items()}
+    if include_stint_stats:
+        if stint_stats is None:
+            stint_stats = compute_stint_stats(rotation_index)
+        for game_id, player_stats in stint_stats_by_game(stint_stats).items():
+            game_extras.setdefault(game_id, {})["stint_stats"] = player_stats
+
+    # Decide what to rebuild up front from the ledger and two directory listings.
+    ledger = load_ledger(output_dir)
+    fingerprints = compute_input_fingerprints(
+        game_ids, rotation_index, rotation_offsets, dates_index, dates_offsets, pbp_dir)
+    existing_outputs = scan_files(output_dir, ".json")
+    output_options = [option for option, enabled in ((output_mode, output_mode != "pretty"),
+                                                     ("lineups", include_lineups),
+                                                     ("stints", include_stint_stats)) if enabled]
+    if output_options:
+        # Changing output options must rewrite files built with other options.
+        suffix = "-".join(output_options)
+        fingerprints = {game_id: f"{fp}-{suffix}" for game_id, fp in fingerprints.items()}
+    to_build, up_to_date = plan_build(fingerprints, ledger, existing_outputs, force=force)
+    to_build = set(to_build)
+    print(f"{len(to_build)} games need building; {len(up_to_date)} are up to date.")
+
     generated_count = 0
-    skipped_count = 0
+    skipped_count = len(up_to_date)
 
-    for game_id in game_ids:
-        output_file_path = os.path.join(output_dir, f"{game_id}.json")
-        if os.path.exists(output_file_path):
-            skipped_count += 1
-            continue
-
-        game_rotations = rotation_df[rotation_df["GAME_ID"].astype(str) == str(game_id)]
-        if game_rotations.empty:
-            print(f"Warning: Skipping game {game_id} due to missing rotation data.")
-            continue
-
-        # Get game date info right away, as it's needed regardless of the team ID method.
-        game_dates_info = dates_df[dates_df["GAME_ID"].astype(str) == str(game_id)]
-        if game_dates_info.empty:
-            # This case should be rare since we are iterating on game_ids from dates_df, but it's a good safeguard.
-            print(f"Warning: Could not find date info for game {game_id}. Skipping.")
-            continue
-        
-        # **FIX**: Get the date from the correct DataFrame (game_dates_info)
-        game_date_str = str(game_dates_info['date'].iloc[0])
-
-        home_team_id = None
-        away_team_id = None
-
-        # --- Method 1: Try to get teams from game_dates.csv (Primary) ---
-        try:
-            home_team_info = game_dates_info[game_dates_info["team"] == game_dates_info["HTM"]].iloc[0]
-            away_team_info = game_dates_info[game_dates_info["team"] != game_dates_info["HTM"]].iloc[0]
-            home_team_id = home_team_info["TEAM_ID"]
-            away_team_id = away_team_info["TEAM_ID"]
-        except (IndexError, KeyError):
-            # --- Method 2: If primary fails, use PBP file (Fallback) ---
-            print(f"Info for game {game_id} not in dates file. Trying PBP fallback...")
-            pbp_file_path = os.path.join(pbp_dir, f"{game_id}.csv")
-            if os.path.exists(pbp_file_path):
+    build_ids = [game_id for game_id in game_ids if str(game_id) in to_build]
+    errors = []
+    rebuilt = set()
+
+    # Home/away for every game to build in one pass; PBP files are read only for the
+    # games the dates table cannot resolve.
+    resolved_teams, pbp_scores, team_messages = resolve_home_away(
+        build_ids, date_lookup, rotation_index, rotation_offsets, pbp_dir, output_dir, workers=workers)
+    for message in team_messages:
+        print(message)
+    # Games the fallback could not resolve were reported above; they are not built.
+    build_ids = [game_id for game_id in build_ids
+                 if int(game_id) not in date_lookup or int(game_id) in resolved_teams]
+    for game_id in build_ids:
+        if int(game_id) in date_lookup:
+            home_team_id, away_team_id = resolved_teams.get(int(game_id), (None, None))
+            game_date, _, _, playoffs = date_lookup[int(game_id)]
+            date_lookup[int(game_id)] = (game_date, home_team_id, away_team_id, playoffs)
+
+    if workers > 1 and len(build_ids) > 1:
+        # Each shard carries only its own games' rows, so the full tables are never pickled.
+        shard_count = min(len(build_ids), workers * shards_per_worker)
+        shards = [
+            (list(shard_ids),
+             _shard_rows(rotation_index, rotation_offsets, shard_ids),
+             {int(g): date_lookup[int(g)] for g in shard_ids if int(g) in date_lookup},
+             {int(g): name_dicts[int(g)] for g in shard_ids if int(g) in name_dicts},
+             {int(g): starter_lists[int(g)] for g in shard_ids if int(g) in starter_lists},
+             {int(g): game_extras[int(g)] for g in shard_ids if int(g) in game_extras},
+             {int(g): pbp_scores[int(g)] for g in shard_ids if int(g) in pbp_scores},
+             pbp_dir, output_dir, pbp_tail_scan, output_mode)
+            for shard_ids in np.array_split(np.array(build_ids, dtype=object), shard_count)
+        ]
+        print(f"Generating {len(build_ids)} games in {shard_count} shards across {workers} processes...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_generate_shard, shard) for shard in shards]
+            for future in as_completed(futures):
                 try:
-                    pbp_df = pd.read_csv(pbp_file_path, low_memory=False)
-                    home_event = pbp_df[pbp_df['HOMEDESCRIPTION'].notna()].iloc[0]
-                    home_team_id = int(home_event['PLAYER1_TEAM_ID'])
-
-                    all_teams_in_game = game_rotations['TEAM_ID'].unique()
-                    if len(all_teams_in_game) >= 2:
-                        away_team_id = [team for team in all_teams_in_game if team != home_team_id][0]
-                    
-                    if not away_team_id or home_team_id == away_team_id:
-                        print(f"Warning: Could not distinguish home/away teams from PBP for game {game_id}. Skipping.")
-                        continue
+                    generated, messages = future.result()
                 except Exception as e:
-                    print(f"Warning: Could not determine teams from PBP for game {game_id}: {e}. Skipping.")
+                    errors.append(f"Error: A generation shard failed: {e}")
                     continue
-            else:
-                print(f"Warning: No PBP file found for game {game_id} to use as fallback. Skipping.")
-                continue
-        
-        if not home_team_id or not away_team_id:
-            print(f"Warning: Failed to identify teams for game {game_id}. Skipping.")
-            continue
+                for message in messages:
+                    print(message)
+                    if message.startswith("Error"):
+                        errors.append(message)
+                for game_id in generated:
+                    ledger[str(game_id)] = fingerprints[str(game_id)]
+                    rebuilt.add(str(game_id))
+                generated_count += len(generated)
+    else:
+        # Same error handling as _generate_shard, so `errors` means the same in both modes.
+        def log(message):
+            print(message)
+            if message.startswith("Error"):
+                errors.append(message)
 
-        try:
-            home_team_details = game_rotations[game_rotations["TEAM_ID"] == home_team_id].iloc[0]
-            away_team_details = game_rotations[game_rotations["TEAM_ID"] == away_team_id].iloc[0]
-        except IndexError:
-            print(f"Warning: Could not find team details in rotation data for game {game_id}. Skipping.")
-            continue
-
-        home_score, away_score = None, None
-        pbp_file_path = os.path.join(pbp_dir, f"{game_id}.csv")
-        if os.path.exists(pbp_file_path):
+        for game_id in build_ids:
+            output_file_path = os.path.join(output_dir, f"{game_id}.json")
+            game_rotations = get_game_rows(rotation_index, rotation_offsets, game_id)
             try:
-                pbp_df = pd.read_csv(pbp_file_path, low_memory=False)
-                final_score_series = pbp_df['SCORE'].dropna()
-                if not final_score_series.empty:
-                    score_parts = final_score_series.iloc[-1].split(' - ')
-                    if len(score_parts) == 2:
-                        home_score, away_score = int(score_parts[0]), int(score_parts[1])
+                built = build_game_file(game_id, game_rotations, date_lookup.get(int(game_id)), pbp_dir,
+                                        output_file_path, name_dicts.get(int(game_id), {}),
+                                        starter_lists.get(int(game_id), []), pbp_tail_scan=pbp_tail_scan,
+                                        output_mode=output_mode, extras=game_extras.get(int(game_id)),
+                                        final_score=pbp_scores.get(int(game_id)), log=log)
             except Exception as e:
-                print(f"Error processing PBP file for game {game_id}: {e}")
-
-        name_dict = {str(row['PERSON_ID']): f"{row['PLAYER_FIRST']} {row['PLAYER_LAST']}"
-                     for _, row in game_rotations[['PERSON_ID', 'PLAYER_FIRST', 'PLAYER_LAST']].drop_duplicates().iterrows()}
-        starters = game_rotations[game_rotations["IN_TIME_REAL"] == 0.0]
-        starter_on = ','.join(starters["PERSON_ID"].astype(str).tolist())
-
-        game_output = {
-            "homeTeam": {"name": home_team_details["TEAM_NAME"], "score": home_score, "logo": f"https://cdn.nba.com/logos/nba/{home_team_id}/primary/L/logo.svg"},
-            "awayTeam": {"name": away_team_details["TEAM_NAME"], "score": away_score, "logo": f"https://cdn.nba.com/logos/nba/{away_team_id}/primary/L/logo.svg"},
-            "game_id": str(game_id),
-            # **FIX**: Use the game_date_str variable captured earlier
-            "date": pd.to_datetime(game_date_str, format='%Y%m%d').strftime('%Y-%m-%d'),
-            "status": "Final",
-            "players": name_dict,
-            "starter_on": starter_on
-        }
-
-        with open(output_file_path, 'w') as f:
-            json.dump(game_output, f, indent=4)
-        generated_count += 1
+                log(f"Error: Failed to generate game {game_id}: {e}")
+                continue
+            if built:
+                ledger[str(game_id)] = fingerprints[str(game_id)]
+                rebuilt.add(str(game_id))
+                generated_count += 1
+
+    save_ledger(output_dir, ledger)
+
+    if bundle:
+        # Only rebuilt games are re-serialized; the rest are copied from the previous bundle.
+        bundled_count = write_games_bundle(output_dir, [game_id for game_id in game_ids if str(game_id) in ledger],
+                                           rebuilt=rebuilt)
+        print(f"Bundled {bundled_count} games into {os.path.join(output_dir, BUNDLE_NAME)}")
 
     print(f"\n--- Processing Complete ---")
     print(f"Files Generated: {generated_count}")
-    print(f"Files Skipped (already existed): {skipped_count}")
+    print(f"Files Skipped (up to date): {skipped_count}")
+    if errors:
+        print(f"Errors: {len(errors)}")
+    return generated_count, skipped_count, errors
 
 
-# --- Part 3: Execution ---
+# --- Part 4: Execution ---
 
 if __name__ == "__main__":
     SHOT_DATA_BASE_PATH = "../shot_data"
     PBP_DIR = "gameplaybyplay"
     OUTPUT_DIR = "game_info"
-    DATES_CSV_URL = "https://raw.githubusercontent.com/gabriel1200/shot_data/refs/heads/master/game_dates.csv"
+    DATES_CACHE_DIR = os.path.join(SHOT_DATA_BASE_PATH, "game_dates_cache")
+    DATES_LOCAL_PATH = None  # Path to a local game_dates file for fully offline builds
+    DATES_OFFLINE = False  # True uses the cached copy without contacting the server
+    ROTATION_WORKERS = 8  # Files are small, so a thread pool hides per-file latency
+    ROTATION_STORE_DIR = os.path.join(SHOT_DATA_BASE_PATH, "rotation_store")
+    GENERATION_WORKERS = os.cpu_count() or 1
+    OUTPUT_MODE = "compact"  # "pretty" keeps the indented per-game layout
+    BUNDLE_GAMES = True
+    INCLUDE_LINEUPS = True  # Precomputed on-court lineup intervals in each game JSON
+    INCLUDE_STINT_STATS = True  # Per-player minutes/stint stats, cached in the rotation store
 
-    rotation_data = fetch_rotation_data(base_path=SHOT_DATA_BASE_PATH)
+    rotation_data = fetch_rotation_data(
+        base_path=SHOT_DATA_BASE_PATH,
+        workers=ROTATION_WORKERS,
+        store_dir=ROTATION_STORE_DIR
+    )
 
     if not rotation_data.empty:
         try:
-            dates_data = pd.read_csv(DATES_CSV_URL)
-            dates_data = dates_data[dates_data.season >= '2013-14']
-            print("Successfully loaded and filtered game dates file.")
+            dates_data = load_game_dates(DATES_CACHE_DIR, url=DATES_CSV_URL, local_path=DATES_LOCAL_PATH,
+                                         offline=DATES_OFFLINE, min_season='2013-14')
+            if dates_data.empty:
+                print("Fatal Error: No game dates are available, online or cached.")
+            else:
+                print("Successfully loaded and filtered game dates file.")
         except Exception as e:
-            print(f"Fatal Error: Could not load game dates file from URL. {e}")
+            print(f"Fatal Error: Could not load game dates file. {e}")
             dates_data = pd.DataFrame()
 
         if not dates_data.empty:
@@ -205,7 +489,13 @@ if __name__ == "__main__":
                 rotation_df=rotation_data,
                 dates_df=dates_data,
                 pbp_dir=PBP_DIR,
-                output_dir=OUTPUT_DIR
+                output_dir=OUTPUT_DIR,
+                workers=GENERATION_WORKERS,
+                output_mode=OUTPUT_MODE,
+                bundle=BUNDLE_GAMES,
+                include_lineups=INCLUDE_LINEUPS,
+                include_stint_stats=INCLUDE_STINT_STATS,
+                stint_stats=load_stint_stats(ROTATION_STORE_DIR) if INCLUDE_STINT_STATS else None
             )
     else:
         print("Halting execution because no rotation data could be loaded.")
@@ -0,0 +1,129 @@
+import os
+import json
+
+from pbp_reader import read_pbp_facts
+from rotation_loader import EXECUTORS
+from io_utils import write_json_atomic
+
+HOME_AWAY_CACHE_NAME = "_home_away.json"
+
+
+def load_home_away_cache(output_dir):
+    """
+    Loads the cached PBP fallback results:
+    {game_id: [pbp mtime_ns, pbp size, home_team_id, home_score, away_score]}.
+    """
+    cache_path = os.path.join(output_dir, HOME_AWAY_CACHE_NAME)
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read home/away cache ({e}). Unresolved games will be re-read from PBP.")
+        return {}
+
+
+def save_home_away_cache(output_dir, cache):
+    """
+    Writes the home/away cache atomically next to the generated game files.
+    """
+    write_json_atomic(os.path.join(output_dir, HOME_AWAY_CACHE_NAME), cache, separators=(",", ":"), sort_keys=True)
+
+
+def read_fallback_facts(pbp_file_path):
+    """
+    Worker entry point: returns (facts, error message) from one PBP file. The home team
+    and the final score come from the same pass (see read_pbp_facts), so the game's
+    file does not have to be read again when it is built.
+    """
+    try:
+        return read_pbp_facts(pbp_file_path, need_home_team=True), None
+    except Exception as e:
+        return None, str(e)
+
+
+def resolve_home_away(game_ids, date_lookup, rotation_index, rotation_offsets, pbp_dir, output_dir,
+                      workers=1, executor="thread"):
+    """
+    Resolves home and away team IDs for every game in `game_ids` at once.
+
+    Games whose home/away sides were found in the dates table (see
+    build_game_date_lookup) are taken as-is. Only the rest fall back to their PBP
+    files: the home team is the team of the first HOMEDESCRIPTION event, and the away
+    team is the other team in the game's rotation rows. Those files are read in
+    parallel, and the results are cached in output_dir keyed by each file's mtime and
+    size, so unchanged games are not re-read.
+    Returns ({game_id: (home_team_id, away_team_id)}, {game_id: (home_score, away_score)}
+    for games resolved from PBP, warning messages). Games missing from the first dict
+    have already been reported in the messages.
+    """
+    teams = {}
+    unresolved = []
+    for game_id in game_ids:
+        info = date_lookup.get(int(game_id))
+        if info is None:
+            continue
+        if info[1] is not None and info[2] is not None:
+            teams[int(game_id)] = (info[1], info[2])
+        else:
+            unresolved.append(int(game_id))
+    if not unresolved:
+        return teams, {}, []
+
+    print(f"{len(unresolved)} games are not resolved by the dates file. Trying PBP fallback...")
+    messages = []
+    cache = load_home_away_cache(output_dir)
+    facts = {}
+    to_read = []
+    for game_id in unresolved:
+        pbp_file_path = os.path.join(pbp_dir, f"{game_id}.csv")
+        try:
+            stat = os.stat(pbp_file_path)
+        except OSError:
+            messages.append(f"Warning: No PBP file found for game {game_id} to use as fallback. Skipping.")
+            cache.pop(str(game_id), None)
+            continue
+        entry = cache.get(str(game_id))
+        if entry and len(entry) == 5 and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            facts[game_id] = {"home_team_id": entry[2], "home_score": entry[3], "away_score": entry[4]}
+        else:
+            to_read.append((game_id, pbp_file_path, stat.st_mtime_ns, stat.st_size))
+
+    paths = [pbp_file_path for _, pbp_file_path, _, _ in to_read]
+    if workers > 1 and len(paths) > 1:
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}'. Expected one of: {', '.join(EXECUTORS)}")
+        with EXECUTORS[executor](max_workers=workers) as pool:
+            results = list(pool.map(read_fallback_facts, paths))
+    else:
+        results = [read_fallback_facts(path) for path in paths]
+
+    for (game_id, _, mtime_ns, size), (pbp_facts, error) in zip(to_read, results):
+        if error is not None:
+            messages.append(f"Warning: Could not determine teams from PBP for game {game_id}: {error}. Skipping.")
+            continue
+        facts[game_id] = pbp_facts
+        cache[str(game_id)] = [mtime_ns, size, pbp_facts["home_team_id"],
+                               pbp_facts["home_score"], pbp_facts["away_score"]]
+    save_home_away_cache(output_dir, cache)
+
+    scores = {}
+    for game_id, pbp_facts in facts.items():
+        home_team_id = pbp_facts["home_team_id"]
+        if home_team_id is None:
+            messages.append(f"Warning: Could not determine teams from PBP for game {game_id}: "
+                            f"no home-team event in PBP. Skipping.")
+            continue
+        bounds = rotation_offsets.get(game_id)
+        # TEAM_ID may be nullable Int32; rows without a team cannot name the away side.
+        all_teams_in_game = rotation_index["TEAM_ID"].iloc[bounds[0]:bounds[1]].dropna().unique() if bounds else []
+        away_team_id = None
+        if len(all_teams_in_game) >= 2:
+            away_team_id = next((team for team in all_teams_in_game if team != home_team_id), None)
+        if not away_team_id or home_team_id == away_team_id:
+            messages.append(f"Warning: Could not distinguish home/away teams from PBP for game {game_id}. Skipping.")
+            continue
+        teams[game_id] = (home_team_id, int(away_team_id))
+        scores[game_id] = (pbp_facts["home_score"], pbp_facts["away_score"])
+    return teams, scores, messages
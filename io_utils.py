@@ -0,0 +1,65 @@
+import pandas as pd
+import os
+import json
+from contextlib import contextmanager
+
+
+def apply_dtypes(df, dtypes, categories=None, coerce=False):
+    """
+    Casts the columns of df listed in `dtypes` in place and returns it; absent columns
+    are ignored. Integer columns with missing values get the matching nullable type
+    (e.g. int32 -> Int32). Values that are not integers raise, unless coerce=True,
+    which treats them as missing and prints how many were dropped. Categorical
+    columns listed in `categories` ({column: [values]}) keep that category order,
+    with unseen values appended in sorted order.
+    """
+    for column, dtype in dtypes.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if dtype == "category":
+            values = values.astype("category")
+            if categories and column in categories:
+                known = list(categories[column])
+                extras = sorted(set(values.cat.categories) - set(known))
+                values = values.cat.set_categories(known + extras)
+            df[column] = values
+        elif dtype.startswith("int") and values.isna().any():
+            if coerce:
+                numeric = pd.to_numeric(values, errors="coerce")
+                coerced = int((numeric.isna() & values.notna()).sum())
+                if coerced:
+                    print(f"Warning: {coerced} non-numeric values in '{column}' were treated as missing.")
+                values = numeric
+            df[column] = values.astype(dtype.capitalize())
+        else:
+            df[column] = values.astype(dtype)
+    return df
+
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yields a temporary path next to `path` to write to; once the block finishes, the
+    temporary file replaces `path` in one step, so readers never see a half-written
+    file. On error the temporary file is removed and `path` is left as it was, as it
+    is when the block writes nothing.
+    """
+    tmp_path = path + ".tmp"
+    try:
+        yield tmp_path
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if os.path.exists(tmp_path):
+        os.replace(tmp_path, path)
+
+
+def write_json_atomic(path, data, **dump_options):
+    """
+    Writes `data` as JSON to `path` atomically; dump_options are passed to json.dump.
+    """
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, **dump_options)
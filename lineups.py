@@ -0,0 +1,235 @@
+import pandas as pd
+import numpy as np
+
+LINEUP_SIZE = 5
+PLAYER_COLUMNS = [f"P{i + 1}" for i in range(LINEUP_SIZE)]
+
+
+STINT_COLUMNS = ["GAME_ID", "TEAM_ID", "PERSON_ID", "IN_TIME_REAL", "OUT_TIME_REAL"]
+
+
+def _stint_arrays(rotation_df, value_columns=()):
+    """
+    Pulls clean stint arrays out of a rotation table: rows with missing IDs/times or
+    non-positive length are dropped. Returns (game, team, person, t_in, t_out) as int64,
+    followed by one float64 array per value column (missing values as 0).
+    """
+    stints = rotation_df[STINT_COLUMNS + list(value_columns)].dropna(subset=STINT_COLUMNS)
+    stints = stints[stints["OUT_TIME_REAL"] > stints["IN_TIME_REAL"]]
+    ids = tuple(stints[column].to_numpy(dtype=np.int64) for column in STINT_COLUMNS)
+    return ids + tuple(stints[column].fillna(0).to_numpy(dtype=np.float64) for column in value_columns)
+
+
+def _expand_stints(group, t_in, t_out):
+    """
+    Puts every stint boundary of every group on one sorted integer axis (group * span + t)
+    and expands each stint onto the elementary intervals it covers.
+    Returns (boundaries, span, interval, stint): interval[k] is the index into boundaries
+    of the interval's start, and stint[k] the stint covering it.
+    """
+    span = int(t_out.max()) + 1
+    base = group.astype(np.int64) * span
+    boundaries = np.unique(np.concatenate([base + t_in, base + t_out]))
+
+    first = np.searchsorted(boundaries, base + t_in)
+    counts = np.searchsorted(boundaries, base + t_out) - first
+    stint = np.repeat(np.arange(len(first)), counts)
+    interval = np.repeat(first, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+    return boundaries, span, interval, stint
+
+
+def lineup_intervals(rotation_df, value_columns=()):
+    """
+    Sweeps every game's stints at once into elementary lineup intervals per team.
+
+    Every IN/OUT boundary of a team's stints starts a new interval; each stint is
+    expanded onto the intervals it covers and the players are collected per interval.
+    Returns a DataFrame with GAME_ID, TEAM_ID, start, end (tenths of a second), P1..P5
+    (sorted PERSON_IDs, -1 where fewer than five were on court) and n_players.
+    Each per-stint value column (e.g. PT_DIFF) is spread over the stint's intervals in
+    proportion to their length and summed over the players on court.
+    """
+    game, team, person, t_in, t_out, *values = _stint_arrays(rotation_df, value_columns)
+    columns = ["GAME_ID", "TEAM_ID", "start", "end"] + PLAYER_COLUMNS + ["n_players"] + list(value_columns)
+    if len(game) == 0:
+        return pd.DataFrame(columns=columns)
+
+    # One integer key per (game, team) so all boundaries live on one sorted axis.
+    group, _ = pd.factorize(pd.MultiIndex.from_arrays([game, team]))
+    boundaries, span, interval, stint = _expand_stints(group, t_in, t_out)
+
+    order = np.lexsort((person[stint], interval))
+    interval, stint = interval[order], stint[order]
+    players = person[stint]
+    interval_ids, starts, sizes = np.unique(interval, return_index=True, return_counts=True)
+
+    lineup = np.full((len(interval_ids), LINEUP_SIZE), -1, dtype=np.int64)
+    row = np.repeat(np.arange(len(interval_ids)), sizes)
+    rank = np.arange(len(interval)) - np.repeat(starts, sizes)
+    keep = rank < LINEUP_SIZE
+    lineup[row[keep], rank[keep]] = players[keep]
+
+    interval_group = boundaries[interval_ids] // span
+    group_first_row = np.unique(group, return_index=True)[1]
+    intervals = pd.DataFrame({
+        "GAME_ID": game[group_first_row][interval_group],
+        "TEAM_ID": team[group_first_row][interval_group],
+        "start": boundaries[interval_ids] - interval_group * span,
+        "end": boundaries[interval_ids + 1] - interval_group * span,
+    })
+    for i, column in enumerate(PLAYER_COLUMNS):
+        intervals[column] = lineup[:, i]
+    intervals["n_players"] = sizes
+
+    share = (boundaries[interval + 1] - boundaries[interval]) / (t_out - t_in)[stint]
+    for column, stint_values in zip(value_columns, values):
+        intervals[column] = np.bincount(row, weights=stint_values[stint] * share, minlength=len(interval_ids))
+    return intervals
+
+
+def lineup_timeline(rotation_df):
+    """
+    Lineup intervals per team with adjacent intervals that have the same five players
+    merged. Returns a DataFrame with GAME_ID, TEAM_ID, start, end (tenths of a second),
+    P1..P5 (sorted PERSON_IDs, -1 where fewer than five were on court) and n_players.
+    """
+    intervals = lineup_intervals(rotation_df)
+    if intervals.empty:
+        return intervals
+
+    game = intervals["GAME_ID"].to_numpy()
+    team = intervals["TEAM_ID"].to_numpy()
+    start = intervals["start"].to_numpy()
+    end = intervals["end"].to_numpy()
+    lineup = intervals[PLAYER_COLUMNS].to_numpy()
+    sizes = intervals["n_players"].to_numpy()
+
+    # Merge back-to-back intervals whose lineup did not actually change.
+    same_as_previous = np.zeros(len(intervals), dtype=bool)
+    same_as_previous[1:] = ((game[1:] == game[:-1])
+                            & (team[1:] == team[:-1])
+                            & (start[1:] == end[:-1])
+                            & (lineup[1:] == lineup[:-1]).all(axis=1)
+                            & (sizes[1:] == sizes[:-1]))
+    run = np.cumsum(~same_as_previous) - 1
+    run_first = np.flatnonzero(~same_as_previous)
+    run_end = np.zeros(len(run_first), dtype=np.int64)
+    np.maximum.at(run_end, run, end)
+
+    timeline = intervals.iloc[run_first].reset_index(drop=True)
+    timeline["end"] = run_end
+    return timeline
+
+
+def lineups_by_game(timeline):
+    """
+    Groups a lineup timeline for export: {game_id: {team_id: [[start, end, [person_ids]]]}},
+    with person IDs as strings to match the "players" keys of the game JSON.
+    """
+    result = {}
+    rows = zip(
+        timeline["GAME_ID"].tolist(), timeline["TEAM_ID"].tolist(),
+        timeline["start"].tolist(), timeline["end"].tolist(),
+        timeline[PLAYER_COLUMNS].to_numpy().tolist(),
+    )
+    for game_id, team_id, start, end, player_ids in rows:
+        team_lineups = result.setdefault(game_id, {}).setdefault(team_id, [])
+        team_lineups.append([start, end, [str(p) for p in player_ids if p != -1]])
+    return result
+
+
+# --- On-court interval index ---
+
+def build_oncourt_index(rotation_df):
+    """
+    Builds an in-memory interval index over the stints of every game.
+
+    All games share one sorted boundary axis (game * span + t); for each elementary
+    interval the covering stints are stored contiguously (CSR layout), so a point or
+    range query is a binary search plus a slice. Returns a dict of arrays used by
+    on_court_at, on_court_at_many and stints_overlapping.
+    """
+    game, team, person, t_in, t_out = _stint_arrays(rotation_df)
+    stints = pd.DataFrame({"GAME_ID": game, "TEAM_ID": team, "PERSON_ID": person,
+                           "IN_TIME_REAL": t_in, "OUT_TIME_REAL": t_out})
+    if len(game) == 0:
+        return {"groups": {}, "span": 1, "boundaries": np.empty(0, dtype=np.int64),
+                "ptr": np.zeros(1, dtype=np.int64), "cover_stint": np.empty(0, dtype=np.int64), "stints": stints}
+
+    group, game_keys = pd.factorize(game)
+    boundaries, span, interval, stint = _expand_stints(group, t_in, t_out)
+    order = np.lexsort((team[stint], interval))
+    interval, stint = interval[order], stint[order]
+
+    return {
+        "groups": {int(game_id): g for g, game_id in enumerate(game_keys)},
+        "span": span,
+        "boundaries": boundaries,
+        "ptr": np.searchsorted(interval, np.arange(len(boundaries) + 1)),
+        "cover_stint": stint,
+        "stints": stints,
+    }
+
+
+def _interval_positions(index, game_ids, times):
+    """
+    Vectorized lookup of the elementary interval holding each (game, t) pair.
+    Returns boundary positions, with -1 where the game is unknown or t is outside its stints.
+    """
+    game_ids = np.atleast_1d(np.asarray(game_ids, dtype=np.int64))
+    times = np.atleast_1d(np.asarray(times, dtype=np.int64))
+    game_ids, times = np.broadcast_arrays(game_ids, times)
+    group = np.array([index["groups"].get(int(game_id), -1) for game_id in np.unique(game_ids)])
+    group = group[np.searchsorted(np.unique(game_ids), game_ids)]
+
+    keys = group * index["span"] + times
+    position = np.searchsorted(index["boundaries"], keys, side="right") - 1
+    valid = (group >= 0) & (times >= 0) & (times < index["span"]) & (position >= 0)
+    valid[valid] &= index["boundaries"][position[valid]] // index["span"] == group[valid]
+    return np.where(valid, position, -1)
+
+
+def on_court_at_many(index, game_ids, times):
+    """
+    Batch query: which stints were on court at each (game, tenth-second) pair.
+    game_ids may be a single ID or an array matching times. Returns (row_offsets, stints)
+    in CSR form: the on-court stints for query i are stints.iloc[row_offsets[i]:row_offsets[i + 1]].
+    """
+    position = _interval_positions(index, game_ids, times)
+    ptr = index["ptr"]
+    found = position >= 0
+    starts = np.where(found, ptr[np.maximum(position, 0)], 0)
+    lengths = np.where(found, ptr[np.maximum(position, 0) + 1] - starts, 0)
+
+    row_offsets = np.concatenate([[0], np.cumsum(lengths)])
+    gather = np.repeat(starts, lengths) + (np.arange(row_offsets[-1]) - np.repeat(row_offsets[:-1], lengths))
+    return row_offsets, index["stints"].iloc[index["cover_stint"][gather]].reset_index(drop=True)
+
+
+def on_court_at(index, game_id, t, team_id=None):
+    """
+    Returns the PERSON_IDs on court in a game at tenth-second t, optionally for one team.
+    """
+    _, stints = on_court_at_many(index, game_id, t)
+    if team_id is not None:
+        stints = stints[stints["TEAM_ID"] == int(team_id)]
+    return stints["PERSON_ID"].to_numpy()
+
+
+def stints_overlapping(index, game_id, t0, t1):
+    """
+    Returns the stints of a game that overlap [t0, t1), found by binary search for the
+    first and last elementary intervals in the range.
+    """
+    group = index["groups"].get(int(game_id))
+    if group is None or t1 <= t0:
+        return index["stints"].iloc[0:0]
+    span, boundaries, ptr = index["span"], index["boundaries"], index["ptr"]
+    game_start = np.searchsorted(boundaries, group * span)
+    game_stop = np.searchsorted(boundaries, (group + 1) * span)
+    first = max(np.searchsorted(boundaries, group * span + max(int(t0), 0), side="right") - 1, game_start)
+    last = min(np.searchsorted(boundaries, group * span + min(int(t1), span), side="left"), game_stop)
+    if first >= last:
+        return index["stints"].iloc[0:0]
+    stint_ids = np.unique(index["cover_stint"][ptr[first]:ptr[last]])
+    return index["stints"].iloc[stint_ids]
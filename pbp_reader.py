@@ -0,0 +1,93 @@
+import pandas as pd
+import os
+import csv
+
+# The only play-by-play columns the game index needs.
+PBP_COLUMNS = ["SCORE", "HOMEDESCRIPTION", "PLAYER1_TEAM_ID"]
+
+
+def parse_score(score_str):
+    """
+    Splits a PBP score string such as "102 - 99" into a pair of ints, or returns None.
+    """
+    score_parts = str(score_str).split(' - ')
+    if len(score_parts) != 2:
+        return None
+    try:
+        return int(score_parts[0]), int(score_parts[1])
+    except ValueError:
+        return None
+
+
+def read_final_score_tail(pbp_file_path, block_size=16384, max_bytes=1 << 20):
+    """
+    Finds the last non-empty SCORE in a PBP CSV by reading backwards from the end
+    of the file in blocks, so the rest of the game is never parsed.
+    Returns the parsed score pair, or None if no score was found within max_bytes
+    of the end or a line could not be parsed (callers should then fall back to a full read).
+    """
+    with open(pbp_file_path, "rb") as f:
+        header = next(csv.reader([f.readline().decode("utf-8")]), [])
+        if "SCORE" not in header:
+            return None
+        score_idx = header.index("SCORE")
+        data_start = f.tell()
+
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        pos = end
+        partial = b""
+        while pos > data_start and end - pos < max_bytes:
+            read_size = min(block_size, pos - data_start)
+            pos -= read_size
+            f.seek(pos)
+            lines = (f.read(read_size) + partial).split(b"\n")
+
+            # The first line of a block may be cut off; keep it for the next block.
+            if pos > data_start:
+                partial = lines.pop(0)
+            for line in reversed(lines):
+                line = line.strip(b"\r")
+                if not line:
+                    continue
+                try:
+                    row = next(csv.reader([line.decode("utf-8")]), [])
+                except (csv.Error, UnicodeDecodeError):
+                    return None  # Multi-line or malformed field; let the caller do a full read
+                if len(row) > score_idx and row[score_idx]:
+                    return parse_score(row[score_idx])
+    return None
+
+
+def read_pbp_facts(pbp_file_path, need_home_team=True, tail_scan=False):
+    """
+    Extracts everything the game index needs from one PBP file in a single pass.
+
+    Returns a dict with `home_team_id` (the PLAYER1_TEAM_ID of the first event with a
+    HOMEDESCRIPTION, or None), `home_score` and `away_score` (from the last SCORE, or None).
+    Only the needed columns are parsed. With tail_scan=True and need_home_team=False,
+    the final score is read from the end of the file without parsing the whole game.
+    """
+    facts = {"home_team_id": None, "home_score": None, "away_score": None}
+
+    if tail_scan and not need_home_team:
+        final_score = read_final_score_tail(pbp_file_path)
+        if final_score is not None:
+            facts["home_score"], facts["away_score"] = final_score
+            return facts
+
+    pbp_df = pd.read_csv(pbp_file_path, usecols=lambda c: c in PBP_COLUMNS, low_memory=False)
+
+    if need_home_team and "HOMEDESCRIPTION" in pbp_df.columns:
+        home_events = pbp_df[pbp_df['HOMEDESCRIPTION'].notna()]
+        if not home_events.empty and pd.notna(home_events['PLAYER1_TEAM_ID'].iloc[0]):
+            facts["home_team_id"] = int(home_events['PLAYER1_TEAM_ID'].iloc[0])
+
+    if "SCORE" in pbp_df.columns:
+        final_score_series = pbp_df['SCORE'].dropna()
+        if not final_score_series.empty:
+            final_score = parse_score(final_score_series.iloc[-1])
+            if final_score is not None:
+                facts["home_score"], facts["away_score"] = final_score
+
+    return facts
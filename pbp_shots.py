@@ -0,0 +1,119 @@
+import pandas as pd
+import numpy as np
+import os
+
+from build_ledger import scan_files, game_content_hashes, load_ledger, save_ledger
+from shot_store import load_shot_index, decode_shot_records
+
+# Shot-detail columns attached to each matching play-by-play event.
+SHOT_JOIN_COLUMNS = ['LOC_X', 'LOC_Y', 'SHOT_DISTANCE', 'SHOT_ZONE_BASIC', 'SHOT_ZONE_RANGE']
+
+
+def enrich_events(pbp_df, shots_df):
+    """
+    Left-joins shot details onto play-by-play events for any number of games at once,
+    matching (_game_key, EVENTNUM) to (GAME_ID, GAME_EVENT_ID). Events without a shot
+    keep empty shot columns; duplicate shot rows for one event are ignored.
+    """
+    shot_keys = (shots_df[['GAME_ID', 'GAME_EVENT_ID'] + SHOT_JOIN_COLUMNS]
+                 .dropna(subset=['GAME_ID', 'GAME_EVENT_ID'])
+                 .drop_duplicates(subset=['GAME_ID', 'GAME_EVENT_ID'])
+                 .rename(columns={'GAME_ID': '_shot_game', 'GAME_EVENT_ID': '_shot_event'}))
+    shot_keys['_shot_game'] = shot_keys['_shot_game'].astype('int64')
+    shot_keys['_shot_event'] = shot_keys['_shot_event'].astype('int64')
+
+    events = pbp_df.drop(columns=[c for c in SHOT_JOIN_COLUMNS if c in pbp_df.columns])
+    events['_event_key'] = pd.to_numeric(events['EVENTNUM'], errors='coerce').fillna(-1).astype('int64')
+    merged = events.merge(shot_keys, how='left', left_on=['_game_key', '_event_key'],
+                          right_on=['_shot_game', '_shot_event'], sort=False)
+    return merged.drop(columns=['_event_key', '_shot_game', '_shot_event'])
+
+
+def read_pbp_batch(pbp_dir, game_keys):
+    """
+    Reads the PBP files for a batch of games into one DataFrame tagged with an
+    integer _game_key taken from each file name.
+    """
+    frames = []
+    for game_key in game_keys:
+        file_path = os.path.join(pbp_dir, f"{game_key}.csv")
+        try:
+            df = pd.read_csv(file_path, low_memory=False)
+        except Exception as e:
+            print(f"Could not process PBP file {file_path}: {e}")
+            continue
+        df['_game_key'] = int(game_key)
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def shot_digests(shots_df):
+    """
+    Hashes each game's shot records (keys plus SHOT_JOIN_COLUMNS) in one vectorized pass:
+    {game_id: hex digest}. Games without shots are absent.
+    """
+    shots = shots_df[['GAME_ID', 'GAME_EVENT_ID'] + SHOT_JOIN_COLUMNS].dropna(subset=['GAME_ID', 'GAME_EVENT_ID'])
+    game_ids = shots['GAME_ID'].to_numpy(dtype=np.int64)
+    order = np.lexsort((shots['GAME_EVENT_ID'].to_numpy(dtype=np.int64), game_ids))
+    shots = shots.iloc[order].reset_index(drop=True)
+    unique_ids, starts = np.unique(game_ids[order], return_index=True)
+    stops = np.append(starts[1:], len(shots))
+    return game_content_hashes(shots, dict(zip(unique_ids.tolist(), zip(starts.tolist(), stops.tolist()))))
+
+
+def build_enriched_events(pbp_dir, shots_df, output_dir="game_events", batch_size=500, force=False):
+    """
+    Writes one JSON file of shot-enriched events per game to output_dir.
+
+    Games are processed in batches: each batch's PBP files are concatenated and joined
+    to the shot table in a single merge, then split back into per-game files. A game is
+    skipped when its output is newer than its PBP file and a build ledger in output_dir
+    holds the same digest of its shot records (see shot_digests), unless force=True.
+    Outputs without a ledger entry are rebuilt once so their shots are recorded.
+    Returns the number of files written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    pbp_files = scan_files(pbp_dir, ".csv")
+    existing_outputs = scan_files(output_dir, ".json")
+    ledger = load_ledger(output_dir)
+    digests = {str(game_id): digest for game_id, digest in shot_digests(shots_df).items()}
+    game_keys = sorted(
+        stem for stem, (mtime_ns, _) in pbp_files.items()
+        if stem.isdigit() and (force or stem not in existing_outputs or existing_outputs[stem][0] < mtime_ns
+                               or ledger.get(str(int(stem))) != digests.get(str(int(stem)), "none"))
+    )
+    print(f"{len(game_keys)} of {len(pbp_files)} games need enriched event files.")
+
+    # Only shots for games with PBP files take part in the join.
+    shot_game_ids = pd.to_numeric(shots_df['GAME_ID'], errors='coerce')
+    wanted = np.array([int(key) for key in game_keys], dtype=np.int64)
+    shots_df = shots_df[shot_game_ids.isin(wanted).to_numpy()]
+
+    written = 0
+    for batch_start in range(0, len(game_keys), batch_size):
+        batch = game_keys[batch_start:batch_start + batch_size]
+        pbp_df = read_pbp_batch(pbp_dir, batch)
+        if pbp_df.empty:
+            continue
+        enriched = enrich_events(pbp_df, shots_df)
+        for game_key, game_events in enriched.groupby('_game_key', sort=False):
+            output_file_path = os.path.join(output_dir, f"{game_key}.json")
+            game_events.drop(columns=['_game_key']).to_json(output_file_path, orient='records')
+            ledger[str(game_key)] = digests.get(str(game_key), "none")
+            written += 1
+        save_ledger(output_dir, ledger)
+        print(f"Enriched {min(batch_start + batch_size, len(game_keys))}/{len(game_keys)} games...")
+
+    print(f"Files Generated: {written}")
+    return written
+
+
+if __name__ == "__main__":
+    PBP_DIR = "gameplaybyplay"
+    SHOT_INDEX_DIR = "shot_index"
+    OUTPUT_DIR = "game_events"
+
+    records, offsets, meta = load_shot_index(SHOT_INDEX_DIR)
+    build_enriched_events(PBP_DIR, decode_shot_records(records, meta), output_dir=OUTPUT_DIR)
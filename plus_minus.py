@@ -0,0 +1,158 @@
+import pandas as pd
+import numpy as np
+import os
+from itertools import combinations
+
+from lineups import LINEUP_SIZE, PLAYER_COLUMNS, STINT_COLUMNS, lineup_intervals
+from rotation_outline import fetch_rotation_data
+
+TENTHS_PER_MINUTE = 600
+# Grouping keys for each aggregation level; "all" pools every season.
+LEVELS = {"game": ["GAME_ID"], "season": ["season"], "all": []}
+
+
+def _level_keys(level):
+    if level not in LEVELS:
+        raise ValueError(f"Unknown level '{level}'. Expected one of: {', '.join(LEVELS)}")
+    return LEVELS[level]
+
+
+def _attach_season(frame, rotation_df):
+    """
+    Adds the rotation table's season label (e.g. "2024", "2024ps") to a frame keyed by GAME_ID.
+    """
+    if "season" not in rotation_df.columns:
+        raise ValueError("Season-level aggregation needs the 'season' column of the rotation table.")
+    seasons = rotation_df[["GAME_ID", "season"]].dropna().drop_duplicates("GAME_ID")
+    seasons = seasons.astype({"GAME_ID": "int64", "season": "str"})
+    return frame.merge(seasons, on="GAME_ID", how="left")
+
+
+def net_point_intervals(rotation_df):
+    """
+    Elementary lineup intervals (see lineups.lineup_intervals) with MIN and PT_DIFF.
+
+    Each stint's PT_DIFF is spread over the intervals it covers in proportion to their
+    length; averaging over the players on court gives the team's estimated net points
+    for the interval. Compute this once and pass it to player_on_off/lineup_stats when
+    aggregating several levels.
+    """
+    intervals = lineup_intervals(rotation_df, value_columns=("PT_DIFF",))
+    intervals["MIN"] = (intervals["end"] - intervals["start"]) / TENTHS_PER_MINUTE
+    intervals["PT_DIFF"] = intervals["PT_DIFF"] / intervals["n_players"]
+    return intervals
+
+
+def player_on_off(rotation_df, level="game", intervals=None):
+    """
+    Player on/off point differential at the given level ("game", "season" or "all").
+
+    On-court totals come straight from the player's stints; off-court totals are the
+    team's totals in the same games minus the on-court part. Returns one row per
+    (level keys, TEAM_ID, PERSON_ID) with GAMES, STINTS, PTS, ON_MIN, ON_PT_DIFF,
+    OFF_MIN, OFF_PT_DIFF and ON_OFF (per-48 on minus per-48 off net points).
+    """
+    keys = _level_keys(level)
+    if intervals is None:
+        intervals = net_point_intervals(rotation_df)
+
+    stints = rotation_df[STINT_COLUMNS + ["PT_DIFF", "PLAYER_PTS"]].dropna(subset=STINT_COLUMNS)
+    stints = stints[stints["OUT_TIME_REAL"] > stints["IN_TIME_REAL"]]
+    stints = pd.DataFrame({
+        "GAME_ID": stints["GAME_ID"].to_numpy(dtype=np.int64),
+        "TEAM_ID": stints["TEAM_ID"].to_numpy(dtype=np.int64),
+        "PERSON_ID": stints["PERSON_ID"].to_numpy(dtype=np.int64),
+        "MIN": (stints["OUT_TIME_REAL"] - stints["IN_TIME_REAL"]).to_numpy(dtype=np.float64) / TENTHS_PER_MINUTE,
+        "PT_DIFF": stints["PT_DIFF"].fillna(0).to_numpy(dtype=np.float64),
+        "PTS": stints["PLAYER_PTS"].fillna(0).to_numpy(dtype=np.float64),
+    })
+
+    on = stints.groupby(["GAME_ID", "TEAM_ID", "PERSON_ID"], as_index=False, sort=False).agg(
+        STINTS=("MIN", "size"), PTS=("PTS", "sum"), ON_MIN=("MIN", "sum"), ON_PT_DIFF=("PT_DIFF", "sum"))
+    team = intervals.groupby(["GAME_ID", "TEAM_ID"], as_index=False, sort=False).agg(
+        TEAM_MIN=("MIN", "sum"), TEAM_PT_DIFF=("PT_DIFF", "sum"))
+
+    games = on.merge(team, on=["GAME_ID", "TEAM_ID"], how="left")
+    games["OFF_MIN"] = (games["TEAM_MIN"] - games["ON_MIN"]).clip(lower=0)
+    games["OFF_PT_DIFF"] = games["TEAM_PT_DIFF"] - games["ON_PT_DIFF"]
+    games["GAMES"] = 1
+    games = games.drop(columns=["TEAM_MIN", "TEAM_PT_DIFF"])
+
+    # Coarser levels are sums of the per-game rows, so off-court time only counts
+    # games the player actually appeared in.
+    if level != "game":
+        if level == "season":
+            games = _attach_season(games, rotation_df)
+        totals = ["GAMES", "STINTS", "PTS", "ON_MIN", "ON_PT_DIFF", "OFF_MIN", "OFF_PT_DIFF"]
+        games = games.groupby(keys + ["TEAM_ID", "PERSON_ID"], as_index=False)[totals].sum()
+
+    on_rate = games["ON_PT_DIFF"] / games["ON_MIN"] * 48
+    off_rate = games["OFF_PT_DIFF"] / games["OFF_MIN"].where(games["OFF_MIN"] > 0) * 48
+    games["ON_OFF"] = on_rate - off_rate
+    columns = keys + ["TEAM_ID", "PERSON_ID", "GAMES", "STINTS", "PTS",
+                      "ON_MIN", "ON_PT_DIFF", "OFF_MIN", "OFF_PT_DIFF", "ON_OFF"]
+    return games[columns].sort_values(keys + ["TEAM_ID", "PERSON_ID"]).reset_index(drop=True)
+
+
+def lineup_stats(rotation_df, size=5, level="game", intervals=None):
+    """
+    Minutes and net points for every `size`-man combination of teammates on court
+    together (size=2 for two-man units, 5 for full lineups) at the given level.
+    Returns one row per (level keys, TEAM_ID, P1..P{size}) with MIN, PT_DIFF and
+    PLUS_MINUS_48, sorted by minutes played.
+    """
+    if not 1 <= size <= LINEUP_SIZE:
+        raise ValueError(f"Lineup size must be between 1 and {LINEUP_SIZE}, got {size}.")
+    keys = _level_keys(level)
+    if intervals is None:
+        intervals = net_point_intervals(rotation_df)
+    if level == "season":
+        intervals = _attach_season(intervals, rotation_df)
+
+    unit_columns = PLAYER_COLUMNS[:size]
+    lineup = intervals[PLAYER_COLUMNS].to_numpy()
+    frames = []
+    # Players in each interval are sorted, so every column combination yields each unit
+    # in one canonical order.
+    for combo in combinations(range(LINEUP_SIZE), size):
+        members = lineup[:, combo]
+        present = (members != -1).all(axis=1)
+        frames.append(intervals.loc[present, keys + ["TEAM_ID", "MIN", "PT_DIFF"]]
+                      .assign(**dict(zip(unit_columns, members[present].T))))
+    units = pd.concat(frames, ignore_index=True)
+
+    stats = units.groupby(keys + ["TEAM_ID"] + unit_columns, as_index=False, sort=False)[["MIN", "PT_DIFF"]].sum()
+    stats["PLUS_MINUS_48"] = stats["PT_DIFF"] / stats["MIN"] * 48
+    return stats.sort_values(keys + ["MIN"], ascending=[True] * len(keys) + [False]).reset_index(drop=True)
+
+
+def aggregate_plus_minus(rotation_df, levels=("game", "season", "all")):
+    """
+    Builds player on/off, two-man and five-man tables for each level from a single
+    interval sweep. Returns {level: {"on_off": df, "two_man": df, "five_man": df}}.
+    """
+    intervals = net_point_intervals(rotation_df)
+    return {
+        level: {
+            "on_off": player_on_off(rotation_df, level, intervals),
+            "two_man": lineup_stats(rotation_df, 2, level, intervals),
+            "five_man": lineup_stats(rotation_df, 5, level, intervals),
+        }
+        for level in levels
+    }
+
+
+# --- Execution ---
+if __name__ == "__main__":
+    OUTPUT_DIR = "plus_minus"
+    store_dir = os.path.join(os.path.dirname(__file__), "../shot_data/rotation_store")
+    rotation_df = fetch_rotation_data(workers=8, store_dir=store_dir)
+
+    if not rotation_df.empty:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        for level, tables in aggregate_plus_minus(rotation_df).items():
+            for name, table in tables.items():
+                table.to_csv(os.path.join(OUTPUT_DIR, f"{name}_{level}.csv"), index=False)
+                print(f"{name}_{level}: {len(table)} rows")
+    else:
+        print("\nNo data was collected.")
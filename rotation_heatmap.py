@@ -0,0 +1,135 @@
+import pandas as pd
+import numpy as np
+import os
+
+from lineups import STINT_COLUMNS
+from rotation_outline import fetch_rotation_data
+from io_utils import atomic_path
+
+# Fixed game clock grid: 48 regulation minutes plus up to four five-minute overtimes.
+# Court time past the last overtime is clipped.
+SECONDS_PER_MINUTE = 60
+REGULATION_MINUTES = 48
+OVERTIME_MINUTES = 5
+MAX_OVERTIMES = 4
+GRID_MINUTES = REGULATION_MINUTES + MAX_OVERTIMES * OVERTIME_MINUTES
+GRID_SECONDS = GRID_MINUTES * SECONDS_PER_MINUTE
+PROBABILITY_SCALE = 255  # On-court probabilities are stored as uint8 fractions of this
+
+
+def rasterize_stints(stints):
+    """
+    Rasterizes stints onto the per-second game grid, one row per (GAME_ID, PERSON_ID).
+    Stint boundaries are rounded from tenths to whole seconds. Returns (rows, on_court)
+    where rows is a DataFrame of the row keys and on_court a (rows, GRID_SECONDS) uint8
+    array that is 1 while the player is on court.
+    """
+    stints = stints[STINT_COLUMNS].dropna()
+    stints = stints[stints["OUT_TIME_REAL"] > stints["IN_TIME_REAL"]]
+    game = stints["GAME_ID"].to_numpy(dtype=np.int64)
+    person = stints["PERSON_ID"].to_numpy(dtype=np.int64)
+    row, _ = pd.factorize(pd.MultiIndex.from_arrays([game, person]))
+    first = np.unique(row, return_index=True)[1]
+    rows = pd.DataFrame({"GAME_ID": game[first], "PERSON_ID": person[first]})
+    second_in = np.clip(np.rint(stints["IN_TIME_REAL"].to_numpy(dtype=np.float64) / 10), 0, GRID_SECONDS).astype(np.int64)
+    second_out = np.clip(np.rint(stints["OUT_TIME_REAL"].to_numpy(dtype=np.float64) / 10), 0, GRID_SECONDS).astype(np.int64)
+
+    # +1 where a stint starts and -1 where it ends; the running sum is the on-court mask.
+    delta = np.zeros((len(rows), GRID_SECONDS + 1), dtype=np.int16)
+    np.add.at(delta, (row, second_in), 1)
+    np.add.at(delta, (row, second_out), -1)
+    on_court = (np.cumsum(delta[:, :-1], axis=1) > 0).astype(np.uint8)
+    return rows, on_court
+
+
+def team_season_heatmap(stints):
+    """
+    Reduces one team-season's stints to "probability on court by minute".
+
+    For every player and game minute, the seconds played are summed over the season
+    and divided by the seconds the team's games actually lasted in that minute, so
+    overtime minutes are only measured against games that went to overtime.
+    Returns a dict of arrays: players, player_games, games (games reaching each minute)
+    and on_court ((players, GRID_MINUTES) uint8 probabilities scaled by PROBABILITY_SCALE).
+    """
+    rows, on_court = rasterize_stints(stints)
+    seconds_by_minute = on_court.reshape(len(rows), GRID_MINUTES, SECONDS_PER_MINUTE).sum(axis=2)
+
+    player_index, players = pd.factorize(rows["PERSON_ID"])
+    player_seconds = np.zeros((len(players), GRID_MINUTES), dtype=np.int64)
+    np.add.at(player_seconds, player_index, seconds_by_minute)
+
+    # A game "reaches" a minute if anyone on the team was on court during it.
+    game_index, games = pd.factorize(rows["GAME_ID"])
+    game_seconds = np.zeros((len(games), GRID_MINUTES), dtype=np.int64)
+    np.maximum.at(game_seconds, game_index, seconds_by_minute)
+    games_reaching = (game_seconds > 0).sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        probability = np.where(games_reaching > 0,
+                               player_seconds / (games_reaching * SECONDS_PER_MINUTE), 0.0)
+    order = np.argsort(players)
+    return {
+        "players": np.asarray(players, dtype=np.int64)[order],
+        "player_games": np.bincount(player_index, minlength=len(players))[order].astype(np.int32),
+        "games": games_reaching.astype(np.int32),
+        "on_court": np.rint(np.clip(probability, 0, 1) * PROBABILITY_SCALE).astype(np.uint8)[order],
+    }
+
+
+def season_heatmaps(rotation_df):
+    """
+    Builds a heatmap for every team-season in a rotation table (which needs the
+    loader's "season" column). Returns {(season, team_id): heatmap}.
+    """
+    if "season" not in rotation_df.columns:
+        raise ValueError("Rotation heatmaps need the 'season' column of the rotation table.")
+    return {
+        (str(season), int(team_id)): team_season_heatmap(stints)
+        for (season, team_id), stints in rotation_df.groupby(["season", "TEAM_ID"], observed=True, sort=True)
+    }
+
+
+def heatmap_path(output_dir, season, team_id):
+    """
+    Location of one team-season heatmap; mirrors the rotation store's partition layout.
+    """
+    return os.path.join(output_dir, f"season={season}", f"team_id={team_id}.npz")
+
+
+def save_heatmaps(heatmaps, output_dir):
+    """
+    Writes each team-season heatmap as a compressed .npz file, atomically.
+    """
+    for (season, team_id), heatmap in heatmaps.items():
+        path = heatmap_path(output_dir, season, team_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_path(path) as tmp_path, open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **heatmap)
+    print(f"Saved {len(heatmaps)} rotation heatmaps to {output_dir}")
+
+
+def load_heatmap(output_dir, season, team_id):
+    """
+    Loads one team-season heatmap, adding "probability" as float32 values in [0, 1].
+    Returns None if it has not been built.
+    """
+    path = heatmap_path(output_dir, season, team_id)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        heatmap = {name: data[name] for name in data.files}
+    heatmap["probability"] = heatmap["on_court"].astype(np.float32) / PROBABILITY_SCALE
+    return heatmap
+
+
+# --- Execution ---
+if __name__ == "__main__":
+    OUTPUT_DIR = "rotation_heatmaps"
+    store_dir = os.path.join(os.path.dirname(__file__), "../shot_data/rotation_store")
+    rotation_df = fetch_rotation_data(workers=8, store_dir=store_dir)
+
+    if not rotation_df.empty:
+        save_heatmaps(season_heatmaps(rotation_df), OUTPUT_DIR)
+    else:
+        print("\nNo data was collected.")
@@ -0,0 +1,111 @@
+import pandas as pd
+import numpy as np
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from io_utils import apply_dtypes
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+# Compact schema for rotation stints: repeated strings as categoricals, IDs and
+# tenth-second stint boundaries as int32, usage as float32.
+ROTATION_DTYPES = {
+    "GAME_ID": "int32",
+    "TEAM_ID": "int32",
+    "TEAM_CITY": "category",
+    "TEAM_NAME": "category",
+    "PERSON_ID": "int32",
+    "PLAYER_FIRST": "category",
+    "PLAYER_LAST": "category",
+    "IN_TIME_REAL": "int32",
+    "OUT_TIME_REAL": "int32",
+    "USG_PCT": "float32",
+    "season": "category",
+    "team_id": "int32",
+}
+TENTH_SECOND_COLUMNS = ("IN_TIME_REAL", "OUT_TIME_REAL")
+
+
+def apply_rotation_schema(df):
+    """
+    Casts a rotation DataFrame to ROTATION_DTYPES in place (see apply_dtypes) and
+    returns it. Stint boundaries are rounded to whole tenths of a second first.
+    """
+    for column in TENTH_SECOND_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce").round()
+    return apply_dtypes(df, ROTATION_DTYPES)
+
+
+def concat_rotation_frames(frames):
+    """
+    Concatenates rotation frames, unifying categorical columns first so the result
+    stays categorical instead of falling back to object strings.
+    """
+    if not frames:
+        return pd.DataFrame()
+    for column, dtype in ROTATION_DTYPES.items():
+        if dtype != "category" or not all(isinstance(df[column].dtype, pd.CategoricalDtype)
+                                          for df in frames if column in df.columns):
+            continue
+        categories = pd.Index(np.concatenate(
+            [df[column].cat.categories.to_numpy() for df in frames if column in df.columns])).unique()
+        for df in frames:
+            if column in df.columns:
+                df[column] = df[column].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def split_player_dimension(df):
+    """
+    Normalizes player names out of a rotation table.
+    Returns (stints without PLAYER_FIRST/PLAYER_LAST, players table keyed by PERSON_ID).
+    """
+    players = (df[["PERSON_ID", "PLAYER_FIRST", "PLAYER_LAST"]]
+               .drop_duplicates("PERSON_ID", keep="last")
+               .sort_values("PERSON_ID")
+               .reset_index(drop=True))
+    return df.drop(columns=["PLAYER_FIRST", "PLAYER_LAST"]), players
+
+
+def read_rotation_file(task, compact=True):
+    """
+    Reads one team-season rotation CSV and tags it with its season and team.
+    Takes a (file_path, year_str, team_id) tuple and returns (file_path, df, error)
+    so it can run inside a worker pool without raising across the pool boundary.
+    With compact=True the file is cast to ROTATION_DTYPES as soon as it is parsed.
+    """
+    file_path, year_str, team_id = task
+    try:
+        df = pd.read_csv(file_path)
+        df["season"] = year_str
+        df["team_id"] = team_id
+        if compact:
+            apply_rotation_schema(df)
+        return file_path, df, None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def load_rotation_files(tasks, workers=1, executor="thread", compact=True):
+    """
+    Reads a list of (file_path, year_str, team_id) tasks and returns (frames, errors).
+
+    With workers=1 the files are read serially. Otherwise they are read by a
+    thread pool (best for latency-bound storage such as NFS) or a process pool
+    (best when CSV parsing dominates). Frames always come back in task order,
+    so the concatenated result matches a serial load row for row.
+    """
+    tasks = list(tasks)
+    read_task = partial(read_rotation_file, compact=compact)
+    if workers is None or workers <= 1 or len(tasks) <= 1:
+        results = [read_task(task) for task in tasks]
+    else:
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}'. Expected one of: {', '.join(EXECUTORS)}")
+        with EXECUTORS[executor](max_workers=workers) as pool:
+            results = list(pool.map(read_task, tasks))
+
+    frames = [df for _, df, error in results if error is None]
+    errors = [(file_path, error) for file_path, _, error in results if error is not None]
+    return frames, errors
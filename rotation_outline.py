@@ -1,82 +1,62 @@
 import pandas as pd
 import os
 
-# Attempt to import the nba_api library
-try:
-    from nba_api.stats.static import teams
-    NBA_API_AVAILABLE = True
-except ImportError:
-    NBA_API_AVAILABLE = False
+from rotation_loader import load_rotation_files, concat_rotation_frames
+from rotation_store import load_rotation_store
+from team_registry import get_team_ids
+from data_discovery import discover_team_files
+from game_dates import load_game_dates
 
 
-def fetch_rotation_data():
+def fetch_rotation_data(workers=1, executor="thread", store_dir=None):
     """
     Loads rotation data for all NBA teams for specified years from a local directory.
     The local directory is ../shot_data/rotations relative to the script.
     Returns one combined DataFrame for all teams/seasons.
+    Set workers > 1 to read the files concurrently with a "thread" or "process" pool.
+    If store_dir is given, the CSVs are mirrored into a columnar store there and only
+    files that changed since the last run are re-parsed.
     """
     # Base path for local rotations folder
     base_path = os.path.join(os.path.dirname(__file__), "../shot_data/rotations")
 
     # --- Configuration ---
     start_year = 2014
-    end_year = 2025
-    years = range(start_year, end_year + 1)
+    end_year = None  # Every season directory found on disk from start_year on
 
-    season_types = ["", "ps"]  # "" for regular season, "ps" for postseason
-
-    # --- Dynamic Team ID Fetching ---
-    team_ids = []
-    if NBA_API_AVAILABLE:
-        print("Fetching team list from nba_api...")
-        try:
-            nba_teams = teams.get_teams()
-            team_ids = [team['id'] for team in nba_teams]
-            print(f"Successfully fetched {len(team_ids)} team IDs.")
-        except Exception as e:
-            print(f"ERROR: Unable to fetch team IDs: {e}")
-    else:
-        print("WARNING: nba_api not found. Please install it or provide team_ids manually.")
+    # --- Team IDs from the bundled registry ---
+    team_ids = get_team_ids()
 
     if not team_ids:
         print("\n--- Halting execution: No team IDs were loaded. ---")
         return pd.DataFrame()
 
-    all_dfs = []
-    print("\n--- Starting Rotation Data Load from Local ---")
+    tasks = discover_team_files(base_path, start_year, end_year, team_ids=team_ids)
 
-    for year in years:
-        for season_suffix in season_types:
-            year_str = f"{year}{season_suffix}"
+    if store_dir:
+        stored_df = load_rotation_store(tasks, store_dir, workers=workers, executor=executor)
+        if stored_df is not None:
+            print("\n--- Data Load Complete ---")
+            return stored_df
 
-            for team_id in team_ids:
-                file_path = os.path.join(base_path, year_str, f"{team_id}.csv")
-
-                if os.path.exists(file_path):
-                    try:
-                        df = pd.read_csv(file_path)
-                        df["season"] = year_str
-                        df["team_id"] = team_id
-                        all_dfs.append(df)
-                    except Exception:
-                        pass
+    print("\n--- Starting Rotation Data Load from Local ---")
+    all_dfs, _ = load_rotation_files(tasks, workers=workers, executor=executor)
 
     print("\n--- Data Load Complete ---")
     if all_dfs:
-        return pd.concat(all_dfs, ignore_index=True)
+        return concat_rotation_frames(all_dfs)
     else:
         return pd.DataFrame()
 
 
 # --- Execution ---
 if __name__ == "__main__":
-    rotation_df = fetch_rotation_data()
+    store_dir = os.path.join(os.path.dirname(__file__), "../shot_data/rotation_store")
+    rotation_df = fetch_rotation_data(workers=8, store_dir=store_dir)
 
     if not rotation_df.empty:
         rotation_df.tail(40).to_csv('rotation_sample.csv', index=False)
-        dates = pd.read_csv(
-            "https://raw.githubusercontent.com/gabriel1200/shot_data/refs/heads/master/game_dates.csv"
-        )
+        dates = load_game_dates(os.path.join(os.path.dirname(__file__), "../shot_data/game_dates_cache"))
         rotation_df.to_csv('rotations_total.csv',index=False)
         dates.tail(40).to_csv("date_sample.csv", index=False)
         
@@ -0,0 +1,162 @@
+import pandas as pd
+import os
+import json
+import hashlib
+
+from rotation_loader import load_rotation_files, apply_rotation_schema
+from io_utils import atomic_path, write_json_atomic
+
+# Parquet support is optional; without it the loaders keep reading the CSVs directly.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+MANIFEST_NAME = "manifest.json"
+# Bumped whenever the stored column types change, so old partitions are rewritten.
+STORE_SCHEMA = "compact-v1"
+
+
+def file_fingerprint(file_path):
+    """
+    Returns the (mtime_ns, size) pair used as the cheap freshness check for a source file.
+    """
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    """
+    Returns the SHA-1 of a file's contents, read in chunks.
+    """
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def partition_path(store_dir, year_str, team_id):
+    """
+    Location of one team-season partition inside the store.
+    """
+    return os.path.join(store_dir, f"season={year_str}", f"team_id={team_id}.parquet")
+
+
+def read_manifest(store_dir):
+    """
+    Loads the store manifest, or an empty one if the store has not been built yet.
+    """
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return {"files": {}}
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read rotation store manifest ({e}). Rebuilding store.")
+        return {"files": {}}
+
+
+def write_manifest(store_dir, manifest):
+    """
+    Writes the manifest atomically so an interrupted sync never leaves a half-written file.
+    """
+    write_json_atomic(os.path.join(store_dir, MANIFEST_NAME), manifest, indent=1, sort_keys=True)
+
+
+def sync_rotation_store(tasks, store_dir, workers=1, executor="thread"):
+    """
+    Brings the columnar store up to date with the rotation CSVs in `tasks`,
+    a list of (file_path, year_str, team_id) tuples.
+
+    A source whose mtime and size match the manifest is trusted as-is. If either
+    changed, its contents are hashed and only files whose hash differs are
+    re-parsed and rewritten. Sources are recorded as resolved paths, so scripts that
+    reach the same files through relative and absolute paths share the store.
+    Partitions whose source file disappeared are removed; partitions outside `tasks`
+    (e.g. other seasons) are left in place.
+    Returns the manifest entries for the given tasks, in task order.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = read_manifest(store_dir)
+    entries = manifest.get("files", {})
+    if manifest.get("schema") != STORE_SCHEMA:
+        entries = {}
+
+    stale = []
+    fresh_entries = {}
+    for file_path, year_str, team_id in tasks:
+        key = f"{year_str}/{team_id}"
+        mtime_ns, size = file_fingerprint(file_path)
+        entry = entries.get(key)
+        partition = partition_path(store_dir, year_str, team_id)
+        if entry and os.path.realpath(entry["source"]) == os.path.realpath(file_path) and os.path.exists(partition):
+            if entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+                fresh_entries[key] = entry
+                continue
+            digest = file_hash(file_path)
+            if entry["sha1"] == digest:
+                fresh_entries[key] = dict(entry, mtime_ns=mtime_ns, size=size)
+                continue
+        stale.append((file_path, year_str, team_id))
+
+    if stale:
+        print(f"Rotation store: re-ingesting {len(stale)} of {len(tasks)} files...")
+        frames, errors = load_rotation_files(stale, workers=workers, executor=executor)
+        for file_path, error in errors:
+            print(f"Could not process file {file_path}: {error}")
+        failed = {file_path for file_path, _ in errors}
+        for (file_path, year_str, team_id), df in zip([t for t in stale if t[0] not in failed], frames):
+            partition = partition_path(store_dir, year_str, team_id)
+            os.makedirs(os.path.dirname(partition), exist_ok=True)
+            with atomic_path(partition) as tmp_path:
+                df.to_parquet(tmp_path, index=False)
+            mtime_ns, size = file_fingerprint(file_path)
+            fresh_entries[f"{year_str}/{team_id}"] = {
+                "source": os.path.realpath(file_path),
+                "mtime_ns": mtime_ns,
+                "size": size,
+                "sha1": file_hash(file_path),
+                "partition": os.path.relpath(partition, store_dir),
+                "rows": len(df),
+            }
+
+    # Entries outside this run's task list stay cached unless their source is gone.
+    task_keys = [f"{year_str}/{team_id}" for _, year_str, team_id in tasks]
+    requested = set(task_keys)
+    for key, entry in entries.items():
+        if key in fresh_entries:
+            continue
+        if key not in requested and os.path.exists(entry["source"]):
+            fresh_entries[key] = entry
+            continue
+        orphan = os.path.join(store_dir, entry["partition"])
+        if os.path.exists(orphan):
+            os.remove(orphan)
+
+    manifest["files"] = fresh_entries
+    manifest["schema"] = STORE_SCHEMA
+    write_manifest(store_dir, manifest)
+
+    return [fresh_entries[key] for key in task_keys if key in fresh_entries]
+
+
+def load_rotation_store(tasks, store_dir, workers=1, executor="thread"):
+    """
+    Syncs the store against `tasks` and returns the rotation table read from it.
+    Partitions are memory-mapped and concatenated in task order, so the result
+    matches a direct CSV load. Returns None when pyarrow is not installed.
+    """
+    if not PYARROW_AVAILABLE:
+        print("WARNING: 'pyarrow' not found. Reading rotation CSVs directly instead of the columnar store.")
+        return None
+
+    entries = sync_rotation_store(tasks, store_dir, workers=workers, executor=executor)
+    if not entries:
+        return pd.DataFrame()
+
+    tables = [pq.read_table(os.path.join(store_dir, entry["partition"]), memory_map=True) for entry in entries]
+    return apply_rotation_schema(pa.concat_tables(tables, promote_options="default").to_pandas())
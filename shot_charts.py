@@ -0,0 +1,406 @@
+import pandas as pd
+import numpy as np
+import os
+from collections import OrderedDict
+
+from team_registry import get_team_ids
+from data_discovery import discover_team_files
+from shot_store import SHOT_COLUMNS, iter_shot_frames, concat_shot_frames
+from io_utils import atomic_path
+
+# Columns needed for charts on top of the consolidated shot columns.
+CHART_COLUMNS = SHOT_COLUMNS + ['PLAYER_ID', 'TEAM_ID', 'SHOT_MADE_FLAG']
+SEASON_TYPE_NAMES = {"": "Regular Season", "ps": "Playoffs"}
+
+# Half-court extent in LOC_X/LOC_Y units (tenths of a foot): (xmin, xmax, ymin, ymax).
+COURT_EXTENT = (-250, 250, -52, 418)
+HEX_GRIDSIZE = 25  # Hexagons across the court width, as in matplotlib's hexbin
+SQUARE_BIN_SIZE = 10  # One-foot squares
+BINNING_METHODS = ("hex", "square")
+# Entity levels for the precomputed grids; each is grouped by season and season type too.
+GRID_LEVELS = {"player": ["PLAYER_ID"], "team": ["TEAM_ID"], "season": []}
+ZONE_COLUMNS = ['SHOT_ZONE_BASIC', 'SHOT_ZONE_RANGE']
+
+
+def load_chart_shots(tasks):
+    """
+    Loads the shot files in `tasks` with the columns charts need, tagging each shot with
+    its season and season type from the directory it was read from. Seasons are named
+    by their end year, as the directories are ("2025ps" holds the 2024-25 playoffs).
+    """
+    frames = []
+    for year_str, _, df in iter_shot_frames(tasks, CHART_COLUMNS):
+        df['season'] = np.int16(year_str[:4])
+        df['season_type'] = SEASON_TYPE_NAMES[year_str[4:]]
+        frames.append(df)
+    shots = concat_shot_frames(frames)
+    if 'season_type' in shots.columns:
+        shots['season_type'] = pd.Categorical(shots['season_type'], categories=list(SEASON_TYPE_NAMES.values()))
+    return shots
+
+
+# --- Vectorized binning ---
+
+def hex_grid_shape(gridsize=HEX_GRIDSIZE, extent=COURT_EXTENT):
+    """
+    Returns (nx, ny) for a hexagonal grid over `extent`, sized like matplotlib's hexbin
+    so the hexagons are regular.
+    """
+    xmin, xmax, ymin, ymax = extent
+    nx = gridsize
+    ny = max(int(nx / np.sqrt(3) * (ymax - ymin) / (xmax - xmin)), 1)
+    return nx, ny
+
+
+def hexbin_cells(x, y, gridsize=HEX_GRIDSIZE, extent=COURT_EXTENT):
+    """
+    Assigns every (x, y) to a hexagon in one vectorized pass using hexbin's two offset
+    lattices: each point goes to the nearer of its candidate centers on either lattice.
+    Returns (cells, n_cells); points outside `extent` get cell -1.
+    """
+    xmin, xmax, ymin, ymax = extent
+    nx, ny = hex_grid_shape(gridsize, extent)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ix = (x - xmin) / ((xmax - xmin) / nx)
+    iy = (y - ymin) / ((ymax - ymin) / ny)
+
+    ix1, iy1 = np.rint(ix), np.rint(iy)
+    ix2, iy2 = np.floor(ix), np.floor(iy)
+    d1 = (ix - ix1) ** 2 + 3.0 * (iy - iy1) ** 2
+    d2 = (ix - ix2 - 0.5) ** 2 + 3.0 * (iy - iy2 - 0.5) ** 2
+    with np.errstate(invalid="ignore"):
+        lattice1 = (np.clip(ix1, 0, nx) * (ny + 1) + np.clip(iy1, 0, ny))
+        lattice2 = (nx + 1) * (ny + 1) + np.clip(ix2, 0, nx - 1) * ny + np.clip(iy2, 0, ny - 1)
+        cells = np.where(d1 < d2, lattice1, lattice2)
+        inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+    cells = np.where(inside, cells, -1).astype(np.int32)
+    return cells, (nx + 1) * (ny + 1) + nx * ny
+
+
+def hex_centers(gridsize=HEX_GRIDSIZE, extent=COURT_EXTENT):
+    """
+    Court coordinates of every hexagon center, indexed like hexbin_cells: (n_cells, 2).
+    """
+    xmin, xmax, ymin, ymax = extent
+    nx, ny = hex_grid_shape(gridsize, extent)
+    sx, sy = (xmax - xmin) / nx, (ymax - ymin) / ny
+    grid1 = np.stack(np.meshgrid(np.arange(nx + 1), np.arange(ny + 1), indexing="ij"), axis=-1).reshape(-1, 2)
+    grid2 = np.stack(np.meshgrid(np.arange(nx), np.arange(ny), indexing="ij"), axis=-1).reshape(-1, 2) + 0.5
+    lattice = np.concatenate([grid1, grid2])
+    return np.column_stack([xmin + lattice[:, 0] * sx, ymin + lattice[:, 1] * sy])
+
+
+def square_cells(x, y, bin_size=SQUARE_BIN_SIZE, extent=COURT_EXTENT):
+    """
+    Assigns every (x, y) to a square bin, matching np.histogram2d with bin_size edges.
+    Returns (cells, n_cells); points outside `extent` get cell -1.
+    """
+    xmin, xmax, ymin, ymax = extent
+    nx = int(np.ceil((xmax - xmin) / bin_size))
+    ny = int(np.ceil((ymax - ymin) / bin_size))
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        ix = np.clip(np.floor((x - xmin) / bin_size), 0, nx - 1)
+        iy = np.clip(np.floor((y - ymin) / bin_size), 0, ny - 1)
+        inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+    cells = np.where(inside, ix * ny + iy, -1).astype(np.int32)
+    return cells, nx * ny
+
+
+def bin_shots(shots, method="hex"):
+    """
+    Bins the LOC_X/LOC_Y of a shot table. Returns (cells, n_cells).
+    """
+    if method not in BINNING_METHODS:
+        raise ValueError(f"Unknown binning method '{method}'. Expected one of: {', '.join(BINNING_METHODS)}")
+    x = shots['LOC_X'].to_numpy(dtype=np.float64, na_value=np.nan)
+    y = shots['LOC_Y'].to_numpy(dtype=np.float64, na_value=np.nan)
+    if method == "hex":
+        return hexbin_cells(x, y)
+    return square_cells(x, y)
+
+
+def _count_dtype(counts):
+    return np.uint16 if counts.max(initial=0) <= np.iinfo(np.uint16).max else np.uint32
+
+
+def shot_grids(shots, method="hex", levels=GRID_LEVELS):
+    """
+    Builds shot-frequency grids for every level in one pass: the shots are binned once,
+    then each level is a single bincount over (group, cell). Returns
+    {level: {"keys": DataFrame of season, season_type and entity columns,
+             "attempts": (groups, n_cells) array, "makes": (groups, n_cells) array}}.
+    """
+    cells, n_cells = bin_shots(shots, method)
+    inside = cells >= 0
+    shots = shots[inside]
+    cells = cells[inside].astype(np.int64)
+    made = shots['SHOT_MADE_FLAG'].fillna(0).to_numpy(dtype=np.float64) if 'SHOT_MADE_FLAG' in shots else None
+
+    grids = {}
+    for level, entity_columns in levels.items():
+        by = ['season', 'season_type'] + entity_columns
+        grouped = shots.groupby(by, observed=True, sort=True)
+        # Shots with a missing entity ID (nullable Int32) belong to no group and are left out.
+        group = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+        n_groups = grouped.ngroups
+        grouped_rows = group >= 0
+        flat = group[grouped_rows] * n_cells + cells[grouped_rows]
+        attempts = np.bincount(flat, minlength=n_groups * n_cells).reshape(n_groups, n_cells)
+        makes = (np.bincount(flat, weights=made[grouped_rows], minlength=n_groups * n_cells).reshape(n_groups, n_cells)
+                 if made is not None else np.zeros_like(attempts))
+        grids[level] = {
+            "keys": grouped.size().reset_index()[by],
+            "attempts": attempts.astype(_count_dtype(attempts)),
+            "makes": makes.astype(_count_dtype(attempts)),
+        }
+    return grids
+
+
+def save_shot_grids(grids, output_dir, method="hex"):
+    """
+    Writes one compressed .npz per level holding its key columns and count arrays.
+    Key columns are stored as fixed-width strings or int64, never as object arrays,
+    so the files load without pickle.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for level, grid in grids.items():
+        path = os.path.join(output_dir, f"{level}_{method}.npz")
+        keys = grid["keys"]
+        arrays = {f"key_{column}": keys[column].to_numpy(
+                      dtype=np.int64 if pd.api.types.is_numeric_dtype(keys[column]) else str)
+                  for column in keys.columns}
+        with atomic_path(path) as tmp_path, open(tmp_path, "wb") as f:
+            np.savez_compressed(f, attempts=grid["attempts"], makes=grid["makes"], **arrays)
+        print(f"Saved {len(grid['keys'])} {level} shot grids to {path}")
+
+
+def load_shot_grids(output_dir, method="hex", levels=GRID_LEVELS):
+    """
+    Loads grids written by save_shot_grids, in the layout shot_grids returns.
+    Levels without a saved file are left out.
+    """
+    grids = {}
+    for level in levels:
+        path = os.path.join(output_dir, f"{level}_{method}.npz")
+        if not os.path.exists(path):
+            continue
+        with np.load(path) as data:
+            keys = pd.DataFrame({name[len("key_"):]: data[name] for name in data.files if name.startswith("key_")})
+            grids[level] = {"keys": keys, "attempts": data["attempts"], "makes": data["makes"]}
+        if 'season_type' in keys.columns:
+            keys['season_type'] = pd.Categorical(keys['season_type'], categories=list(SEASON_TYPE_NAMES.values()))
+    return grids
+
+
+# --- Zone baselines ---
+
+def zone_baselines(shots):
+    """
+    League-average shot distribution per zone, season and season type for each of
+    ZONE_COLUMNS, counted with one bincount per column. Returns a dict with "seasons",
+    "season_types" and, per zone column, (season, season type, zone) arrays of
+    attempts, makes, frequency (share of the league's attempts) and fg_pct.
+    """
+    seasons = np.unique(shots['season'].to_numpy(dtype=np.int64))
+    season_types = list(SEASON_TYPE_NAMES.values())
+    season_index = np.searchsorted(seasons, shots['season'].to_numpy(dtype=np.int64))
+    type_index = pd.Categorical(shots['season_type'], categories=season_types).codes.astype(np.int64)
+    made = shots['SHOT_MADE_FLAG'].to_numpy(dtype=np.float64, na_value=0)
+
+    baselines = {"seasons": seasons, "season_types": season_types}
+    for column in ZONE_COLUMNS:
+        zones = list(shots[column].cat.categories)
+        zone_index = shots[column].cat.codes.to_numpy(dtype=np.int64)
+        valid = (zone_index >= 0) & (type_index >= 0)
+        shape = (len(seasons), len(season_types), len(zones))
+        flat = ((season_index * shape[1] + type_index) * shape[2] + zone_index)[valid]
+        attempts = np.bincount(flat, minlength=np.prod(shape)).reshape(shape)
+        makes = np.bincount(flat, weights=made[valid], minlength=np.prod(shape)).reshape(shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frequency = attempts / attempts.sum(axis=2, keepdims=True)
+            fg_pct = makes / attempts
+        baselines[column] = {
+            "zones": zones,
+            "attempts": attempts.astype(np.uint32),
+            "makes": makes.astype(np.uint32),
+            "frequency": np.nan_to_num(frequency).astype(np.float32),
+            "fg_pct": fg_pct.astype(np.float32),
+        }
+    return baselines
+
+
+def save_zone_baselines(baselines, path):
+    """
+    Writes the baseline tables to one compressed .npz file, atomically.
+    """
+    arrays = {"seasons": baselines["seasons"], "season_types": np.array(baselines["season_types"])}
+    for column in ZONE_COLUMNS:
+        for name, values in baselines[column].items():
+            arrays[f"{column}__{name}"] = np.array(values)
+    with atomic_path(path) as tmp_path, open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    print(f"Saved zone baselines for {len(baselines['seasons'])} seasons to {path}")
+
+
+def load_zone_baselines(path):
+    """
+    Loads baseline tables written by save_zone_baselines.
+    """
+    with np.load(path) as data:
+        baselines = {"seasons": data["seasons"], "season_types": data["season_types"].tolist()}
+        for column in ZONE_COLUMNS:
+            baselines[column] = {name: data[f"{column}__{name}"]
+                                 for name in ("attempts", "makes", "frequency", "fg_pct")}
+            baselines[column]["zones"] = data[f"{column}__zones"].tolist()
+    return baselines
+
+
+def baseline_for(baselines, season, season_type, column='SHOT_ZONE_BASIC'):
+    """
+    Returns the league baseline for one season and season type as a DataFrame indexed
+    by zone, with attempts, frequency and fg_pct; a direct array lookup, no scan.
+    """
+    season_position = np.searchsorted(baselines["seasons"], int(season))
+    if season_position >= len(baselines["seasons"]) or baselines["seasons"][season_position] != int(season):
+        raise KeyError(f"No zone baseline for season {season}.")
+    type_position = baselines["season_types"].index(season_type)
+    table = baselines[column]
+    return pd.DataFrame({
+        "attempts": table["attempts"][season_position, type_position],
+        "frequency": table["frequency"][season_position, type_position],
+        "fg_pct": table["fg_pct"][season_position, type_position],
+    }, index=pd.Index(table["zones"], name=column))
+
+
+def compare_to_baseline(shots, baselines, season, season_type, column='SHOT_ZONE_BASIC'):
+    """
+    Compares a player's or team's shots (already filtered to one season and season
+    type) with the league baseline zone by zone. Returns a DataFrame with the entity's
+    attempts, frequency and fg_pct next to the league's and the frequency difference.
+    """
+    league = baseline_for(baselines, season, season_type, column)
+    zone_index = pd.Categorical(shots[column], categories=list(league.index)).codes.astype(np.int64)
+    valid = zone_index >= 0
+    attempts = np.bincount(zone_index[valid], minlength=len(league))
+    makes = np.bincount(zone_index[valid], weights=shots['SHOT_MADE_FLAG'].to_numpy(dtype=np.float64, na_value=0)[valid],
+                        minlength=len(league))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        comparison = pd.DataFrame({
+            "attempts": attempts,
+            "frequency": attempts / max(attempts.sum(), 1),
+            "fg_pct": makes / attempts,
+            "league_frequency": league["frequency"].to_numpy(),
+            "league_fg_pct": league["fg_pct"].to_numpy(),
+        }, index=league.index)
+    comparison["frequency_diff"] = comparison["frequency"] - comparison["league_frequency"]
+    return comparison
+
+
+# --- Chart cache ---
+
+def chart_key(entity=None, season=None, season_type=None, filters=None):
+    """
+    Normalizes a chart request into a hashable cache key. entity is ("player", id),
+    ("team", id) or None for the whole league; filters maps shot columns to a value or
+    a list of accepted values.
+    """
+    if entity is not None:
+        kind, entity_id = entity
+        if kind not in GRID_LEVELS or not GRID_LEVELS[kind]:
+            raise ValueError(f"Unknown entity type '{kind}'. Expected 'player' or 'team'.")
+        entity = (kind, int(entity_id))
+    normalized = []
+    for column, values in sorted((filters or {}).items()):
+        values = values if isinstance(values, (list, tuple, set)) else [values]
+        normalized.append((column, tuple(sorted(values, key=str))))
+    return (entity, None if season is None else int(season), season_type, tuple(normalized))
+
+
+class ShotChartCache:
+    """
+    In-memory LRU cache of binned shot charts, bounded by a memory budget in bytes.
+
+    The shot table is binned once up front; a miss selects the matching shots with one
+    boolean mask and counts them per cell, then the sparse result (non-empty cells only)
+    is stored, evicting the least recently used charts until it fits the budget.
+    """
+
+    def __init__(self, shots, memory_budget=64 << 20, method="hex"):
+        cells, self.n_cells = bin_shots(shots, method)
+        inside = cells >= 0
+        self.shots = shots[inside].reset_index(drop=True)
+        self.cells = cells[inside]
+        self.memory_budget = memory_budget
+        self.method = method
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._charts = OrderedDict()
+
+    def get(self, entity=None, season=None, season_type=None, filters=None):
+        """
+        Returns the chart for a request as {"cells", "attempts", "makes"} arrays covering
+        only the non-empty cells.
+        """
+        key = chart_key(entity, season, season_type, filters)
+        chart = self._charts.get(key)
+        if chart is not None:
+            self._charts.move_to_end(key)
+            self.hits += 1
+            return chart
+        self.misses += 1
+        chart = self._compute(key)
+        self._store(key, chart)
+        return chart
+
+    def _compute(self, key):
+        entity, season, season_type, filters = key
+        mask = np.ones(len(self.shots), dtype=bool)
+        if entity is not None:
+            kind, entity_id = entity
+            mask &= self.shots[GRID_LEVELS[kind][0]].eq(entity_id).to_numpy(dtype=bool, na_value=False)
+        if season is not None:
+            mask &= self.shots['season'].to_numpy() == season
+        if season_type is not None:
+            mask &= (self.shots['season_type'] == season_type).to_numpy()
+        for column, values in filters:
+            mask &= self.shots[column].isin(values).to_numpy()
+
+        cells = self.cells[mask]
+        attempts = np.bincount(cells, minlength=self.n_cells)
+        made = self.shots['SHOT_MADE_FLAG'].to_numpy(dtype=np.float64, na_value=0)[mask]
+        makes = np.bincount(cells, weights=made, minlength=self.n_cells)
+        occupied = np.flatnonzero(attempts)
+        dtype = _count_dtype(attempts)
+        return {
+            "cells": occupied.astype(np.int32),
+            "attempts": attempts[occupied].astype(dtype),
+            "makes": makes[occupied].astype(dtype),
+        }
+
+    def _store(self, key, chart):
+        size = sum(array.nbytes for array in chart.values())
+        if size > self.memory_budget:
+            return
+        while self._charts and self.nbytes + size > self.memory_budget:
+            _, evicted = self._charts.popitem(last=False)
+            self.nbytes -= sum(array.nbytes for array in evicted.values())
+        self._charts[key] = chart
+        self.nbytes += size
+
+    def __len__(self):
+        return len(self._charts)
+
+
+# --- Execution ---
+if __name__ == "__main__":
+    OUTPUT_DIR = "shot_grids"
+    BINNING_METHOD = "hex"
+
+    tasks = discover_team_files("../shot_data/team", start_year=2014, team_ids=get_team_ids())
+    shots = load_chart_shots(tasks)
+    save_shot_grids(shot_grids(shots, method=BINNING_METHOD), OUTPUT_DIR, method=BINNING_METHOD)
+    save_zone_baselines(zone_baselines(shots), os.path.join(OUTPUT_DIR, "zone_baselines.npz"))
@@ -1,23 +1,13 @@
-import pandas as pd
-from nba_api.stats.static import teams
-import os
-nba_teams = teams.get_teams()
-# Extract just the 'id' from each team dictionary
-team_ids = [team['id'] for team in nba_teams]
+from team_registry import get_team_ids
+from data_discovery import discover_team_files
+from shot_store import consolidate_shots
 
-frames=[]
-for year in range(2014,2026):
-    for team_id in team_ids:
-        carries = ['','ps']
-        for carry in carries:
-            filepath= f"../shot_data/team/{year}{carry}/{team_id}.csv"
-     
-            if os.path.isfile(filepath):
-              
-                columns='SHOT_ZONE_RANGE','SHOT_DISTANCE','LOC_X','LOC_Y','GAME_ID','SHOT_ZONE_BASIC','GAME_ID','GAME_EVENT_ID'
+OUTPUT_FORMAT = "csv"  # "parquet" writes one row group per team-season instead
+SHOT_INDEX_DIR = "shot_index"  # Sorted (GAME_ID, GAME_EVENT_ID) index for per-game lookups; None to skip
 
-                df = pd.read_csv(filepath,usecols=columns)
-                frames.append(df)
-    print(year)
-all_shots=pd.concat(frames)
-all_shots.to_csv('playbyplay_shotdetails.csv',index=False)
\ No newline at end of file
+team_ids = get_team_ids()
+
+tasks = discover_team_files("../shot_data/team", start_year=2014, team_ids=team_ids)
+output_path = 'playbyplay_shotdetails.parquet' if OUTPUT_FORMAT == "parquet" else 'playbyplay_shotdetails.csv'
+# The shot index is built from the same streaming pass, so every file is read once.
+consolidate_shots(tasks, output_path, output_format=OUTPUT_FORMAT, index_dir=SHOT_INDEX_DIR)
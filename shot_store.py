@@ -0,0 +1,308 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+
+from io_utils import apply_dtypes, atomic_path, write_json_atomic
+
+# Parquet output is optional; CSV streaming works with pandas alone.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+SHOT_COLUMNS = ['SHOT_ZONE_RANGE', 'SHOT_DISTANCE', 'LOC_X', 'LOC_Y', 'GAME_ID', 'SHOT_ZONE_BASIC', 'GAME_EVENT_ID']
+OUTPUT_FORMATS = ("csv", "parquet")
+
+# Compact read-time schema: zones as categoricals, court coordinates as int16, IDs as int32,
+# the made flag as int8.
+SHOT_DTYPES = {
+    'SHOT_ZONE_RANGE': 'category',
+    'SHOT_ZONE_BASIC': 'category',
+    'SHOT_DISTANCE': 'int16',
+    'LOC_X': 'int16',
+    'LOC_Y': 'int16',
+    'GAME_ID': 'int32',
+    'GAME_EVENT_ID': 'int32',
+    'PLAYER_ID': 'int32',
+    'TEAM_ID': 'int32',
+    'SHOT_MADE_FLAG': 'int8',
+}
+
+# Fixed category order so every file shares the same codes; unseen values are appended.
+SHOT_ZONE_CATEGORIES = {
+    'SHOT_ZONE_RANGE': ['Less Than 8 ft.', '8-16 ft.', '16-24 ft.', '24+ ft.', 'Back Court Shot'],
+    'SHOT_ZONE_BASIC': ['Restricted Area', 'In The Paint (Non-RA)', 'Mid-Range', 'Left Corner 3',
+                        'Right Corner 3', 'Above the Break 3', 'Backcourt'],
+}
+
+
+def apply_shot_schema(df):
+    """
+    Casts a shot DataFrame to SHOT_DTYPES in place (see apply_dtypes) and returns it,
+    with zones in the fixed SHOT_ZONE_CATEGORIES order.
+    """
+    return apply_dtypes(df, SHOT_DTYPES, SHOT_ZONE_CATEGORIES)
+
+
+def read_shot_file(file_path, columns=SHOT_COLUMNS):
+    """
+    Reads one team-season shot file with the compact schema applied at parse time.
+    Files with missing or non-integer values are re-read and cast after parsing.
+    """
+    read_dtypes = {column: dtype for column, dtype in SHOT_DTYPES.items() if column in columns}
+    try:
+        df = pd.read_csv(file_path, usecols=columns, dtype=read_dtypes)
+    except (ValueError, TypeError):
+        df = pd.read_csv(file_path, usecols=columns)
+    return apply_shot_schema(df)
+
+
+def concat_shot_frames(frames):
+    """
+    Concatenates compact shot frames, unifying zone categories first so the result
+    stays categorical instead of falling back to object strings.
+    """
+    if not frames:
+        return pd.DataFrame(columns=SHOT_COLUMNS)
+    for column in SHOT_ZONE_CATEGORIES:
+        if all(column in df.columns for df in frames):
+            categories = list(dict.fromkeys(c for df in frames for c in df[column].cat.categories))
+            for df in frames:
+                df[column] = df[column].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def iter_shot_frames(tasks, columns=SHOT_COLUMNS):
+    """
+    Reads the team-season shot files in `tasks` ((file_path, year_str, team_id) tuples)
+    one at a time and yields (year_str, team_id, df), printing each season as it starts.
+    """
+    current_season = None
+    for file_path, year_str, team_id in tasks:
+        if year_str != current_season:
+            print(year_str)
+            current_season = year_str
+        try:
+            df = read_shot_file(file_path, columns)
+        except Exception as e:
+            print(f"Could not process file {file_path}: {e}")
+            continue
+        yield year_str, team_id, df
+
+
+def stream_shots_to_csv(tasks, output_path, columns=SHOT_COLUMNS, on_frame=None):
+    """
+    Appends each team-season's shots straight to one CSV, so peak memory is a single
+    file's rows rather than the whole history. Each frame is also passed to on_frame,
+    if given. Returns the number of rows written.
+    """
+    row_count = 0
+    column_order = None
+    with atomic_path(output_path) as tmp_path, open(tmp_path, "w", newline="") as f:
+        for _, _, df in iter_shot_frames(tasks, columns):
+            if on_frame is not None:
+                on_frame(df)
+            if column_order is None:
+                column_order = list(df.columns)
+                df.to_csv(f, index=False)
+            else:
+                df.reindex(columns=column_order).to_csv(f, index=False, header=False)
+            row_count += len(df)
+    return row_count
+
+
+def stream_shots_to_parquet(tasks, output_path, columns=SHOT_COLUMNS, on_frame=None):
+    """
+    Writes each team-season's shots as one Parquet row group, casting every file to the
+    schema of the first so the row groups line up. Each frame is also passed to on_frame,
+    if given. Returns the number of rows written.
+    """
+    row_count = 0
+    writer = None
+    with atomic_path(output_path) as tmp_path:
+        try:
+            for _, _, df in iter_shot_frames(tasks, columns):
+                if on_frame is not None:
+                    on_frame(df)
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                else:
+                    table = table.select(writer.schema.names).cast(writer.schema)
+                writer.write_table(table)
+                row_count += len(df)
+        finally:
+            if writer is not None:
+                writer.close()
+    return row_count
+
+
+def load_shots(tasks, columns=SHOT_COLUMNS):
+    """
+    Loads every shot file in `tasks` into one compact in-memory DataFrame.
+    """
+    return concat_shot_frames([df for _, _, df in iter_shot_frames(tasks, columns)])
+
+
+# --- Game/event shot index ---
+
+# Fixed-width record layout of the on-disk shot index; zones are stored as category codes.
+SHOT_RECORD_DTYPE = np.dtype([
+    ('GAME_ID', '<i4'),
+    ('GAME_EVENT_ID', '<i4'),
+    ('LOC_X', '<i2'),
+    ('LOC_Y', '<i2'),
+    ('SHOT_DISTANCE', '<i2'),
+    ('SHOT_ZONE_BASIC', '<i1'),
+    ('SHOT_ZONE_RANGE', '<i1'),
+])
+OFFSET_DTYPE = np.dtype([('GAME_ID', '<i4'), ('start', '<i8'), ('stop', '<i8')])
+MISSING_INT16 = np.iinfo(np.int16).min  # Stands in for missing coordinates/distances
+SHOT_INDEX_FILES = {"records": "shots.npy", "offsets": "shot_offsets.npy", "meta": "shot_index.json"}
+
+
+def shot_records(shots, zones):
+    """
+    Encodes a compact shot frame as SHOT_RECORD_DTYPE records. `zones` holds the zone
+    category lists shared by every call ({column: [names]}); names not seen before are
+    appended, so files encoded one at a time still agree on their zone codes.
+    """
+    shots = shots.dropna(subset=['GAME_ID', 'GAME_EVENT_ID'])
+    records = np.empty(len(shots), dtype=SHOT_RECORD_DTYPE)
+    for column in ('GAME_ID', 'GAME_EVENT_ID'):
+        records[column] = shots[column].to_numpy(dtype=np.int32)
+    for column in ('LOC_X', 'LOC_Y', 'SHOT_DISTANCE'):
+        records[column] = shots[column].astype('Int16').fillna(MISSING_INT16).to_numpy(dtype=np.int16)
+    for column, names in zones.items():
+        values = shots[column].astype('category')
+        positions = {name: position for position, name in enumerate(names)}
+        for name in values.cat.categories:
+            if name not in positions:
+                positions[name] = len(names)
+                names.append(name)
+        # The trailing -1 keeps missing zones (code -1) missing.
+        remap = np.array([positions[name] for name in values.cat.categories] + [-1], dtype=np.int8)
+        records[column] = remap[values.cat.codes.to_numpy()]
+    return records
+
+
+def sort_shot_records(chunks):
+    """
+    Concatenates record chunks, sorts them by (GAME_ID, GAME_EVENT_ID) and builds the
+    per-game offset table. Returns (records, offsets).
+    """
+    records = np.concatenate(chunks) if chunks else np.empty(0, dtype=SHOT_RECORD_DTYPE)
+    records = records[np.lexsort((records['GAME_EVENT_ID'], records['GAME_ID']))]
+    game_ids, starts = np.unique(records['GAME_ID'], return_index=True)
+    offsets = np.empty(len(game_ids), dtype=OFFSET_DTYPE)
+    offsets['GAME_ID'] = game_ids
+    offsets['start'] = starts
+    offsets['stop'] = np.append(starts[1:], len(records))
+    return records, offsets
+
+
+def write_shot_index(records, offsets, zones, index_dir):
+    """
+    Writes sorted records, their offset table and the zone category lists to index_dir.
+    """
+    meta = {"rows": len(records), "games": len(offsets), "zones": zones}
+    os.makedirs(index_dir, exist_ok=True)
+    for name, array in (("records", records), ("offsets", offsets)):
+        with atomic_path(os.path.join(index_dir, SHOT_INDEX_FILES[name])) as tmp_path, open(tmp_path, "wb") as f:
+            np.save(f, array)
+    write_json_atomic(os.path.join(index_dir, SHOT_INDEX_FILES["meta"]), meta, indent=1)
+    print(f"Indexed {len(records)} shots across {len(offsets)} games in {index_dir}")
+
+
+def new_zone_lists():
+    """
+    Zone category lists to share across shot_records calls, seeded with the fixed order.
+    """
+    return {column: list(categories) for column, categories in SHOT_ZONE_CATEGORIES.items()}
+
+
+def save_shot_index(shots, index_dir):
+    """
+    Writes the shot index: fixed-width records sorted by (GAME_ID, GAME_EVENT_ID),
+    the per-game offset table, and the zone category lists needed to decode them.
+    """
+    zones = new_zone_lists()
+    records, offsets = sort_shot_records([shot_records(apply_shot_schema(shots.copy()), zones)])
+    write_shot_index(records, offsets, zones, index_dir)
+
+
+def load_shot_index(index_dir):
+    """
+    Memory-maps a saved shot index. Returns (records, offsets, meta); only the pages
+    for games that are actually looked up are read from disk.
+    """
+    records = np.load(os.path.join(index_dir, SHOT_INDEX_FILES["records"]), mmap_mode='r')
+    offsets = np.load(os.path.join(index_dir, SHOT_INDEX_FILES["offsets"]))
+    with open(os.path.join(index_dir, SHOT_INDEX_FILES["meta"])) as f:
+        meta = json.load(f)
+    return records, offsets, meta
+
+
+def get_game_shots(records, offsets, game_id):
+    """
+    Returns the records for one game as a slice of the index (binary search on the
+    offset table), or an empty slice if the game has no shots.
+    """
+    position = np.searchsorted(offsets['GAME_ID'], int(game_id))
+    if position >= len(offsets) or offsets['GAME_ID'][position] != int(game_id):
+        return records[0:0]
+    return records[offsets['start'][position]:offsets['stop'][position]]
+
+
+def get_event_shots(records, offsets, game_id, game_event_id):
+    """
+    Returns the records for one (GAME_ID, GAME_EVENT_ID) pair, found by binary search
+    within the game's slice.
+    """
+    game_shots = get_game_shots(records, offsets, game_id)
+    event_ids = game_shots['GAME_EVENT_ID']
+    start = np.searchsorted(event_ids, int(game_event_id), side='left')
+    stop = np.searchsorted(event_ids, int(game_event_id), side='right')
+    return game_shots[start:stop]
+
+
+def decode_shot_records(records, meta):
+    """
+    Turns index records back into a DataFrame with zone names and missing values restored.
+    """
+    df = pd.DataFrame(np.asarray(records))
+    for column in ('LOC_X', 'LOC_Y', 'SHOT_DISTANCE'):
+        df[column] = df[column].astype('Int16').mask(df[column] == MISSING_INT16)
+    for column, categories in meta["zones"].items():
+        df[column] = pd.Categorical.from_codes(df[column].astype('int16'), categories=categories)
+    return df
+
+
+def consolidate_shots(tasks, output_path, output_format="csv", index_dir=None):
+    """
+    Streams every shot file in `tasks` into one consolidated file at output_path.
+    Falls back to CSV when Parquet is requested but pyarrow is not installed.
+    With index_dir, the shot index (see save_shot_index) is built in the same pass:
+    each file is encoded to fixed-width records as it streams by, so only the
+    compact records, not the shot frames, are held until the final sort.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output_format}'. Expected one of: {', '.join(OUTPUT_FORMATS)}")
+    if output_format == "parquet" and not PYARROW_AVAILABLE:
+        print("WARNING: 'pyarrow' not found. Writing CSV instead of Parquet.")
+        output_path = os.path.splitext(output_path)[0] + ".csv"
+        output_format = "csv"
+
+    chunks, zones = [], new_zone_lists()
+    on_frame = (lambda df: chunks.append(shot_records(df, zones))) if index_dir else None
+    if output_format == "parquet":
+        row_count = stream_shots_to_parquet(tasks, output_path, on_frame=on_frame)
+    else:
+        row_count = stream_shots_to_csv(tasks, output_path, on_frame=on_frame)
+    print(f"Wrote {row_count} shots to {output_path}")
+    if index_dir:
+        write_shot_index(*sort_shot_records(chunks), zones, index_dir)
+    return output_path
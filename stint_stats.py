@@ -0,0 +1,119 @@
+import pandas as pd
+import numpy as np
+import os
+import json
+
+from lineups import STINT_COLUMNS
+from rotation_store import PYARROW_AVAILABLE, read_manifest
+from io_utils import atomic_path, write_json_atomic
+
+TENTHS_PER_MINUTE = 600
+STINT_STATS_DIR = "stint_stats"  # Inside the rotation store, mirroring its partition layout
+STINT_STATS_MANIFEST = "stint_stats.json"
+STINT_STATS_COLUMNS = ["GAME_ID", "TEAM_ID", "PERSON_ID", "MIN", "STINTS", "AVG_STINT_MIN",
+                       "LONGEST_REST_MIN", "FIRST_IN", "LAST_OUT"]
+
+
+def compute_stint_stats(rotation_df):
+    """
+    Derives per-player per-game stint statistics from the tenth-second stint boundaries
+    in one sorted pass over every game: minutes, stint count, average stint length,
+    longest rest between stints (minutes) and first-in/last-out (tenths of a second).
+    """
+    stints = rotation_df[STINT_COLUMNS].dropna()
+    stints = stints[stints["OUT_TIME_REAL"] > stints["IN_TIME_REAL"]]
+    game, team, person, t_in, t_out = (stints[column].to_numpy(dtype=np.int64) for column in STINT_COLUMNS)
+    if len(game) == 0:
+        return pd.DataFrame(columns=STINT_STATS_COLUMNS)
+
+    order = np.lexsort((t_in, person, team, game))
+    game, team, person, t_in, t_out = game[order], team[order], person[order], t_in[order], t_out[order]
+    new_player = np.ones(len(game), dtype=bool)
+    new_player[1:] = (game[1:] != game[:-1]) | (team[1:] != team[:-1]) | (person[1:] != person[:-1])
+    starts = np.flatnonzero(new_player)
+
+    rest = np.zeros(len(game), dtype=np.int64)
+    rest[1:] = t_in[1:] - t_out[:-1]
+    rest[new_player] = 0
+
+    minutes = np.add.reduceat(t_out - t_in, starts) / TENTHS_PER_MINUTE
+    counts = np.diff(np.append(starts, len(game)))
+    return pd.DataFrame({
+        "GAME_ID": game[starts],
+        "TEAM_ID": team[starts],
+        "PERSON_ID": person[starts],
+        "MIN": minutes,
+        "STINTS": counts,
+        "AVG_STINT_MIN": minutes / counts,
+        "LONGEST_REST_MIN": np.maximum.reduceat(np.maximum(rest, 0), starts) / TENTHS_PER_MINUTE,
+        "FIRST_IN": np.minimum.reduceat(t_in, starts),
+        "LAST_OUT": np.maximum.reduceat(t_out, starts),
+    })
+
+
+def load_stint_stats(store_dir):
+    """
+    Returns stint statistics for every partition in the rotation store, recomputing
+    only partitions whose source changed since their stats were cached. Stats are kept
+    per team-season under store_dir/stint_stats, keyed by the source file's SHA-1.
+    Returns None when pyarrow is not installed or the store has not been built.
+    """
+    if not PYARROW_AVAILABLE:
+        print("WARNING: 'pyarrow' not found. Stint statistics cannot be cached.")
+        return None
+    entries = read_manifest(store_dir).get("files", {})
+    if not entries:
+        return None
+
+    cache_manifest_path = os.path.join(store_dir, STINT_STATS_MANIFEST)
+    cached = {}
+    if os.path.exists(cache_manifest_path):
+        try:
+            with open(cache_manifest_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read stint stats manifest ({e}). Recomputing all stats.")
+
+    frames = []
+    fresh = {}
+    recomputed = 0
+    for key, entry in sorted(entries.items()):
+        stats_path = os.path.join(store_dir, STINT_STATS_DIR, entry["partition"])
+        if cached.get(key) == entry["sha1"] and os.path.exists(stats_path):
+            frames.append(pd.read_parquet(stats_path))
+        else:
+            stats = compute_stint_stats(pd.read_parquet(os.path.join(store_dir, entry["partition"])))
+            os.makedirs(os.path.dirname(stats_path), exist_ok=True)
+            with atomic_path(stats_path) as tmp_path:
+                stats.to_parquet(tmp_path, index=False)
+            frames.append(stats)
+            recomputed += 1
+        fresh[key] = entry["sha1"]
+
+    if recomputed:
+        print(f"Stint stats: recomputed {recomputed} of {len(entries)} partitions.")
+    write_json_atomic(cache_manifest_path, fresh, indent=1, sort_keys=True)
+    return pd.concat(frames, ignore_index=True)
+
+
+def stint_stats_by_game(stats):
+    """
+    Groups stint statistics for export: {game_id: {person_id_str: {...}}}, with person
+    IDs as strings to match the "players" keys of the game JSON.
+    """
+    result = {}
+    rows = zip(
+        stats["GAME_ID"].tolist(), stats["PERSON_ID"].tolist(), stats["MIN"].round(2).tolist(),
+        stats["STINTS"].tolist(), stats["AVG_STINT_MIN"].round(2).tolist(),
+        stats["LONGEST_REST_MIN"].round(2).tolist(), stats["FIRST_IN"].tolist(), stats["LAST_OUT"].tolist(),
+    )
+    for game_id, person_id, minutes, count, avg_stint, longest_rest, first_in, last_out in rows:
+        result.setdefault(int(game_id), {})[str(person_id)] = {
+            "min": minutes,
+            "stints": count,
+            "avg_stint_min": avg_stint,
+            "longest_rest_min": longest_rest,
+            "first_in": first_in,
+            "last_out": last_out,
+        }
+    return result
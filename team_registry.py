@@ -0,0 +1,92 @@
+# Bundled copy of the 30 franchises with the same id/abbreviation/full_name/nickname/city
+# keys as nba_api's teams.get_teams(), so loading the team list needs no network access
+# and no optional dependency. City matches the TEAM_CITY used in the rotation data.
+TEAMS = (
+    {"id": 1610612737, "abbreviation": "ATL", "full_name": "Atlanta Hawks", "nickname": "Hawks", "city": "Atlanta"},
+    {"id": 1610612738, "abbreviation": "BOS", "full_name": "Boston Celtics", "nickname": "Celtics", "city": "Boston"},
+    {"id": 1610612739, "abbreviation": "CLE", "full_name": "Cleveland Cavaliers", "nickname": "Cavaliers", "city": "Cleveland"},
+    {"id": 1610612740, "abbreviation": "NOP", "full_name": "New Orleans Pelicans", "nickname": "Pelicans", "city": "New Orleans"},
+    {"id": 1610612741, "abbreviation": "CHI", "full_name": "Chicago Bulls", "nickname": "Bulls", "city": "Chicago"},
+    {"id": 1610612742, "abbreviation": "DAL", "full_name": "Dallas Mavericks", "nickname": "Mavericks", "city": "Dallas"},
+    {"id": 1610612743, "abbreviation": "DEN", "full_name": "Denver Nuggets", "nickname": "Nuggets", "city": "Denver"},
+    {"id": 1610612744, "abbreviation": "GSW", "full_name": "Golden State Warriors", "nickname": "Warriors", "city": "Golden State"},
+    {"id": 1610612745, "abbreviation": "HOU", "full_name": "Houston Rockets", "nickname": "Rockets", "city": "Houston"},
+    {"id": 1610612746, "abbreviation": "LAC", "full_name": "Los Angeles Clippers", "nickname": "Clippers", "city": "Los Angeles"},
+    {"id": 1610612747, "abbreviation": "LAL", "full_name": "Los Angeles Lakers", "nickname": "Lakers", "city": "Los Angeles"},
+    {"id": 1610612748, "abbreviation": "MIA", "full_name": "Miami Heat", "nickname": "Heat", "city": "Miami"},
+    {"id": 1610612749, "abbreviation": "MIL", "full_name": "Milwaukee Bucks", "nickname": "Bucks", "city": "Milwaukee"},
+    {"id": 1610612750, "abbreviation": "MIN", "full_name": "Minnesota Timberwolves", "nickname": "Timberwolves", "city": "Minnesota"},
+    {"id": 1610612751, "abbreviation": "BKN", "full_name": "Brooklyn Nets", "nickname": "Nets", "city": "Brooklyn"},
+    {"id": 1610612752, "abbreviation": "NYK", "full_name": "New York Knicks", "nickname": "Knicks", "city": "New York"},
+    {"id": 1610612753, "abbreviation": "ORL", "full_name": "Orlando Magic", "nickname": "Magic", "city": "Orlando"},
+    {"id": 1610612754, "abbreviation": "IND", "full_name": "Indiana Pacers", "nickname": "Pacers", "city": "Indiana"},
+    {"id": 1610612755, "abbreviation": "PHI", "full_name": "Philadelphia 76ers", "nickname": "76ers", "city": "Philadelphia"},
+    {"id": 1610612756, "abbreviation": "PHX", "full_name": "Phoenix Suns", "nickname": "Suns", "city": "Phoenix"},
+    {"id": 1610612757, "abbreviation": "POR", "full_name": "Portland Trail Blazers", "nickname": "Trail Blazers", "city": "Portland"},
+    {"id": 1610612758, "abbreviation": "SAC", "full_name": "Sacramento Kings", "nickname": "Kings", "city": "Sacramento"},
+    {"id": 1610612759, "abbreviation": "SAS", "full_name": "San Antonio Spurs", "nickname": "Spurs", "city": "San Antonio"},
+    {"id": 1610612760, "abbreviation": "OKC", "full_name": "Oklahoma City Thunder", "nickname": "Thunder", "city": "Oklahoma City"},
+    {"id": 1610612761, "abbreviation": "TOR", "full_name": "Toronto Raptors", "nickname": "Raptors", "city": "Toronto"},
+    {"id": 1610612762, "abbreviation": "UTA", "full_name": "Utah Jazz", "nickname": "Jazz", "city": "Utah"},
+    {"id": 1610612763, "abbreviation": "MEM", "full_name": "Memphis Grizzlies", "nickname": "Grizzlies", "city": "Memphis"},
+    {"id": 1610612764, "abbreviation": "WAS", "full_name": "Washington Wizards", "nickname": "Wizards", "city": "Washington"},
+    {"id": 1610612765, "abbreviation": "DET", "full_name": "Detroit Pistons", "nickname": "Pistons", "city": "Detroit"},
+    {"id": 1610612766, "abbreviation": "CHA", "full_name": "Charlotte Hornets", "nickname": "Hornets", "city": "Charlotte"},
+)
+
+# Other spellings seen in game logs and older data sources.
+ABBREVIATION_ALIASES = {
+    "BRK": "BKN", "NJN": "BKN",
+    "CHO": "CHA", "CHH": "CHA",
+    "PHO": "PHX",
+    "NOH": "NOP", "NOK": "NOP", "NO": "NOP",
+    "GS": "GSW", "NY": "NYK", "SA": "SAS",
+    "UTAH": "UTA", "WSH": "WAS",
+}
+
+_ID_BY_ABBREVIATION = {team["abbreviation"]: team["id"] for team in TEAMS}
+_ID_BY_ABBREVIATION.update({alias: _ID_BY_ABBREVIATION[abbr] for alias, abbr in ABBREVIATION_ALIASES.items()})
+_TEAM_BY_ID = {team["id"]: team for team in TEAMS}
+
+
+def get_teams():
+    """
+    Returns the team list as dicts, a drop-in for nba_api's teams.get_teams().
+    """
+    return [dict(team) for team in TEAMS]
+
+
+def get_team_ids():
+    """
+    Returns the 30 team IDs in registry order.
+    """
+    return [team["id"] for team in TEAMS]
+
+
+def team_id_for_abbreviation(abbreviation):
+    """
+    Looks up a team ID by abbreviation (aliases such as BRK or PHO included), or None.
+    """
+    if not isinstance(abbreviation, str):
+        return None
+    return _ID_BY_ABBREVIATION.get(abbreviation.strip().upper())
+
+
+def abbreviation_for_team_id(team_id):
+    """
+    Looks up a team's current abbreviation by ID, or None.
+    """
+    try:
+        team = _TEAM_BY_ID.get(int(team_id))
+    except (TypeError, ValueError):
+        return None
+    return team["abbreviation"] if team else None
+
+
+def abbreviations_to_ids(abbreviations):
+    """
+    Maps a Series of abbreviations (e.g. the HTM/VTM columns of the dates data) to
+    team IDs in one vectorized lookup. Unknown abbreviations become <NA>.
+    """
+    normalized = abbreviations.astype(str).str.strip().str.upper()
+    return normalized.map(_ID_BY_ABBREVIATION).astype("Int64")